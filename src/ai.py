@@ -0,0 +1,434 @@
+"""
+AI 走法搜索 - 落点枚举、启发式评估和束搜索
+
+搜索内部把游戏板表示为每行一个整数掩码的元组（与 BitBoard 相同），隐藏行在前，
+第 y 行为 rows[y + buffer]。游戏板尺寸由 Geometry 给出，碰撞检测直接复用 bitboard.piece_masks。
+"""
+
+from collections import deque
+from functools import lru_cache
+from itertools import chain
+
+try:
+    from board import GRID_WIDTH, GRID_HEIGHT, zobrist_keys
+    from bitboard import piece_masks
+    from tetromino import CELL_OFFSETS, BOUNDING_BOXES, WALL_KICKS
+    from engine import ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE
+except ImportError:
+    import os
+    import sys
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, current_dir)
+    from board import GRID_WIDTH, GRID_HEIGHT, zobrist_keys
+    from bitboard import piece_masks
+    from tetromino import CELL_OFFSETS, BOUNDING_BOXES, WALL_KICKS
+    from engine import ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE
+
+# 路径中表示下移一行的步骤（由重力或软降完成）
+MOVE_DOWN = -1
+
+
+def _column_bottoms(cells):
+    """每个占用列中最低格子的行偏移，返回 ((列, 行偏移), ...)"""
+    bottoms = {}
+    for x, y in cells:
+        bottoms[x] = max(bottoms.get(x, -1), y)
+    return tuple(sorted(bottoms.items()))
+
+
+# 按 [方块类型][旋转状态] 索引的各列底部偏移
+COLUMN_BOTTOMS = tuple(
+    tuple(_column_bottoms(cells) for cells in rotations)
+    for rotations in CELL_OFFSETS
+)
+
+
+def _distinct_rotations(shape_index):
+    """去掉占用格子完全相同的对称旋转状态（O、I、S、Z）"""
+    seen = {}
+    for rotation, cells in enumerate(CELL_OFFSETS[shape_index]):
+        seen.setdefault(frozenset(cells), rotation)
+    return tuple(sorted(seen.values()))
+
+
+DISTINCT_ROTATIONS = tuple(_distinct_rotations(i) for i in range(len(CELL_OFFSETS)))
+
+
+class Geometry:
+    """搜索用的游戏板尺寸，以及按宽度缓存的方块掩码和 Zobrist 键"""
+
+    __slots__ = ('width', 'height', 'buffer', 'full_row', 'masks', 'keys')
+
+    def __init__(self, width, height, buffer):
+        self.width = width
+        self.height = height
+        self.buffer = buffer
+        self.full_row = (1 << width) - 1
+        self.masks = piece_masks(width)
+        self.keys = zobrist_keys(width, height, buffer)
+
+
+@lru_cache(maxsize=None)
+def search_geometry(width=GRID_WIDTH, height=GRID_HEIGHT, buffer=0):
+    """同一尺寸共享一个 Geometry"""
+    return Geometry(width, height, buffer)
+
+
+def board_geometry(board):
+    """游戏板的尺寸"""
+    return search_geometry(board.width, board.height, board.buffer)
+
+
+DEFAULT_GEOMETRY = search_geometry()
+
+
+class Placement:
+    """一个最终落点"""
+
+    __slots__ = ('shape_index', 'rotation', 'x', 'y', 'path')
+
+    def __init__(self, shape_index, rotation, x, y, path=None):
+        self.shape_index = shape_index
+        self.rotation = rotation
+        self.x = x
+        self.y = y
+        self.path = path
+
+    def cells(self):
+        """落点占用的格子"""
+        return frozenset((self.x + x, self.y + y) for x, y in CELL_OFFSETS[self.shape_index][self.rotation])
+
+    def __repr__(self):
+        return f"Placement(shape={self.shape_index}, rotation={self.rotation}, x={self.x}, y={self.y})"
+
+
+def board_rows(board):
+    """把 Board 转换为行掩码元组（隐藏行在前）"""
+    rows = getattr(board, 'rows', None)
+    if rows is not None:
+        return tuple(board.hidden_rows) + tuple(rows)
+    return tuple(
+        sum(1 << x for x, cell in enumerate(row) if cell)
+        for row in chain(board.hidden, board.grid)
+    )
+
+
+def rows_hash(rows, geometry=DEFAULT_GEOMETRY):
+    """计算行掩码的 Zobrist 哈希，与 Board.hash 一致"""
+    value = 0
+    for index, bits in enumerate(rows):
+        keys = geometry.keys[index - geometry.buffer]
+        while bits:
+            low = bits & -bits
+            value ^= keys[low.bit_length() - 1]
+            bits ^= low
+    return value
+
+
+def fits(rows, shape_index, rotation, x, y, geometry=DEFAULT_GEOMETRY):
+    """检查方块能否放在 (x, y)，规则与 Board.is_valid_position 相同"""
+    if x < 0 or x >= geometry.width:
+        return False
+    column_masks = geometry.masks[shape_index][rotation][x]
+    if column_masks is None:
+        return False
+    buffer = geometry.buffer
+    for dy, mask in column_masks:
+        index = y + dy + buffer
+        if index >= len(rows):
+            return False
+        if index >= 0 and rows[index] & mask:
+            return False
+    return True
+
+
+def skyline(rows, geometry=DEFAULT_GEOMETRY):
+    """每列最高的已占用行号，空列为游戏板高度"""
+    tops = [geometry.height] * geometry.width
+    remaining = geometry.full_row
+    for index, bits in enumerate(rows):
+        found = bits & remaining
+        if found:
+            remaining &= ~found
+            for x in range(geometry.width):
+                if found >> x & 1:
+                    tops[x] = index - geometry.buffer
+            if not remaining:
+                break
+    return tops
+
+
+def landing_row(tops, shape_index, rotation, x):
+    """用列高度直接算出从顶部垂直落下的落点行，O(宽度)"""
+    return min(tops[x + column] - 1 - bottom
+               for column, bottom in COLUMN_BOTTOMS[shape_index][rotation])
+
+
+def spawn_position(shape_index, geometry=DEFAULT_GEOMETRY):
+    """新方块的出生位置，与 Tetromino 默认位置一致"""
+    width, _ = BOUNDING_BOXES[shape_index][0]
+    return 0, geometry.width // 2 - width // 2, -geometry.buffer
+
+
+def drop_placements(rows, shape_index, tops=None, geometry=DEFAULT_GEOMETRY):
+    """枚举所有垂直硬降可到达的落点（不含滑入和旋入）"""
+    if tops is None:
+        tops = skyline(rows, geometry)
+    placements = []
+    for rotation in DISTINCT_ROTATIONS[shape_index]:
+        width, _ = BOUNDING_BOXES[shape_index][rotation]
+        for x in range(geometry.width - width + 1):
+            y = landing_row(tops, shape_index, rotation, x)
+            placements.append(Placement(shape_index, rotation, x, y))
+    return placements
+
+
+def enumerate_placements(rows, shape_index, start=None, geometry=DEFAULT_GEOMETRY):
+    """用广度优先搜索枚举所有可到达的落点，包括滑入（tuck）和旋入（spin）
+
+    start 为 (rotation, x, y)，默认为出生位置。返回的落点附带从起点出发的
+    操作路径，路径中的 MOVE_DOWN 表示下移一行。对称旋转得到的相同落点只保留一个。
+    """
+    if start is None:
+        start = spawn_position(shape_index, geometry)
+    if not fits(rows, shape_index, *start, geometry):
+        return []
+
+    parents = {start: None}
+    queue = deque([start])
+    finals = {}
+    while queue:
+        state = queue.popleft()
+        rotation, x, y = state
+
+        if not fits(rows, shape_index, rotation, x, y + 1, geometry):
+            key = frozenset((x + cx, y + cy) for cx, cy in CELL_OFFSETS[shape_index][rotation])
+            finals.setdefault(key, state)
+
+        successors = [
+            ((rotation, x - 1, y), ACTION_LEFT),
+            ((rotation, x + 1, y), ACTION_RIGHT),
+            ((rotation, x, y + 1), MOVE_DOWN),
+        ]
+        new_rotation = (rotation + 1) % 4
+        for dx, dy in WALL_KICKS[shape_index][rotation]:
+            if fits(rows, shape_index, new_rotation, x + dx, y + dy, geometry):
+                successors.append(((new_rotation, x + dx, y + dy), ACTION_ROTATE))
+                break
+
+        for successor, move in successors:
+            if successor in parents:
+                continue
+            if move != ACTION_ROTATE and not fits(rows, shape_index, *successor, geometry):
+                continue
+            parents[successor] = (state, move)
+            queue.append(successor)
+
+    placements = []
+    for state in finals.values():
+        path = []
+        node = state
+        while parents[node] is not None:
+            node, move = parents[node]
+            path.append(move)
+        path.reverse()
+        rotation, x, y = state
+        placements.append(Placement(shape_index, rotation, x, y, path))
+    return placements
+
+
+def place(rows, placement, geometry=DEFAULT_GEOMETRY):
+    """在行掩码上放置方块并消行，返回 (新行掩码元组, 消除行数)"""
+    new_rows = list(rows)
+    buffer = geometry.buffer
+    for dy, mask in geometry.masks[placement.shape_index][placement.rotation][placement.x]:
+        index = placement.y + dy + buffer
+        if index >= 0:  # 确保不在缓冲区之外
+            new_rows[index] |= mask
+
+    full_row = geometry.full_row
+    kept = [bits for bits in new_rows if bits != full_row]
+    lines_cleared = len(new_rows) - len(kept)
+    if lines_cleared:
+        kept = [0] * lines_cleared + kept
+    return tuple(kept), lines_cleared
+
+
+def place_hashed(rows, placement, board_hash, geometry=DEFAULT_GEOMETRY):
+    """放置方块并增量更新哈希，返回 (新行掩码元组, 消除行数, 新哈希)"""
+    new_rows, lines_cleared = place(rows, placement, geometry)
+    if lines_cleared:
+        # 消行后整体移位，重新计算
+        return new_rows, lines_cleared, rows_hash(new_rows, geometry)
+    keys = geometry.keys
+    for x, y in CELL_OFFSETS[placement.shape_index][placement.rotation]:
+        board_y = placement.y + y
+        if board_y >= -geometry.buffer:
+            board_hash ^= keys[board_y][placement.x + x]
+    return new_rows, lines_cleared, board_hash
+
+
+class HeuristicEvaluator:
+    """按加权特征评估局面：总高度、已消行数、空洞数和表面起伏"""
+
+    DEFAULT_WEIGHTS = {
+        'aggregate_height': -0.510066,
+        'lines': 0.760666,
+        'holes': -0.35663,
+        'bumpiness': -0.184483,
+    }
+
+    def __init__(self, weights=None):
+        self.weights = dict(self.DEFAULT_WEIGHTS)
+        if weights:
+            self.weights.update(weights)
+
+    def features(self, rows, lines_cleared, geometry=DEFAULT_GEOMETRY):
+        """计算局面特征"""
+        tops = skyline(rows, geometry)
+        heights = [geometry.height - top for top in tops]
+
+        holes = 0
+        covered = 0
+        for bits in rows:
+            holes += bin(covered & ~bits).count('1')
+            covered |= bits
+
+        return {
+            'aggregate_height': sum(heights),
+            'lines': lines_cleared,
+            'holes': holes,
+            'bumpiness': sum(abs(heights[i] - heights[i + 1]) for i in range(geometry.width - 1)),
+        }
+
+    def __call__(self, rows, lines_cleared, geometry=DEFAULT_GEOMETRY):
+        features = self.features(rows, lines_cleared, geometry)
+        return sum(self.weights[name] * value for name, value in features.items() if name in self.weights)
+
+
+class BeamSearch:
+    """在预览队列上做固定深度的束搜索
+
+    evaluator 是任意可调用对象 evaluator(rows, lines_cleared, geometry) -> 分数，越大越好。
+    depth 为搜索的方块数（当前方块加预览方块）。传入 table（TranspositionTable）时，
+    按 (局面哈希, 方块类型) 缓存单个方块的最佳落点和评分。
+    """
+
+    def __init__(self, evaluator=None, depth=2, beam_width=8, tucks=False, table=None):
+        self.evaluator = evaluator or HeuristicEvaluator()
+        self.depth = depth
+        self.beam_width = beam_width
+        self.tucks = tucks
+        self.table = table
+        self.geometry = None
+
+    def placements(self, rows, shape_index, geometry, start=None, tops=None):
+        if self.tucks or start is not None:
+            return enumerate_placements(rows, shape_index, start, geometry)
+        return drop_placements(rows, shape_index, tops, geometry)
+
+    def best_placement(self, rows, board_hash, shape_index, geometry, tops=None):
+        """单个方块的 (最佳评分, 最佳落点)，结果存入置换表"""
+        if self.table is not None:
+            cached = self.table.get(board_hash, shape_index)
+            if cached is not None:
+                return cached
+
+        best_score = None
+        best = None
+        for placement in self.placements(rows, shape_index, geometry, tops=tops):
+            new_rows, lines = place(rows, placement, geometry)
+            score = self.evaluator(new_rows, lines, geometry)
+            if best is None or score > best_score:
+                best_score = score
+                best = placement
+
+        if self.table is not None and best is not None:
+            self.table.put(board_hash, shape_index, best_score, best)
+        return best_score, best
+
+    def search(self, rows, queue, start=None, board_hash=None, tops=None, geometry=DEFAULT_GEOMETRY):
+        """返回当前方块（queue[0]）的最佳落点，无处可放时返回 None
+
+        start 为当前方块的 (rotation, x, y)，board_hash 为 rows 的哈希（可省略），
+        tops 为 rows 的列高度（可省略，通常直接取自 Board.column_tops）。
+        """
+        if geometry is not self.geometry:
+            # 不同尺寸的局面可能哈希相同，置换表中的落点不能混用
+            self.geometry = geometry
+            if self.table is not None:
+                self.table.clear()
+        queue = queue[:self.depth]
+        if board_hash is None:
+            board_hash = rows_hash(rows, geometry)
+        if len(queue) == 1 and start is None:
+            return self.best_placement(rows, board_hash, queue[0], geometry, tops)[1]
+
+        # 束中每项为 (评分, 行掩码, 哈希, 第一步落点)
+        beam = []
+        for placement in self.placements(rows, queue[0], geometry, start, tops):
+            new_rows, lines, new_hash = place_hashed(rows, placement, board_hash, geometry)
+            beam.append((self.evaluator(new_rows, lines, geometry), new_rows, new_hash, placement))
+        if not beam:
+            return None
+
+        for level, shape_index in enumerate(queue[1:], 2):
+            beam.sort(key=lambda item: item[0], reverse=True)
+            candidates = []
+            for _, state_rows, state_hash, first in beam[:self.beam_width]:
+                if level == len(queue):
+                    # 最后一层只需要每个局面的最佳评分，可以直接查置换表
+                    score, placement = self.best_placement(state_rows, state_hash, shape_index, geometry)
+                    if placement is not None:
+                        candidates.append((score, state_rows, state_hash, first))
+                    continue
+                for placement in self.placements(state_rows, shape_index, geometry):
+                    new_rows, lines, new_hash = place_hashed(state_rows, placement, state_hash, geometry)
+                    candidates.append((self.evaluator(new_rows, lines, geometry),
+                                       new_rows, new_hash, first))
+            if not candidates:
+                break
+            beam = candidates
+
+        return max(beam, key=lambda item: item[0])[3]
+
+
+class Bot:
+    """驱动 GameEngine 的 AI 玩家"""
+
+    def __init__(self, search=None):
+        self.search = search or BeamSearch()
+
+    def choose(self, engine):
+        """为当前方块选择落点"""
+        board = engine.board
+        geometry = board_geometry(board)
+        piece = engine.current_piece
+        queue = [piece.shape_index] + engine.pieces.preview()
+        start = (piece.rotation, piece.x, piece.y)
+        if start == spawn_position(piece.shape_index, geometry) and not self.search.tucks:
+            start = None
+        rows = board_rows(board)
+        # 根节点的列高度直接使用游戏板维护的天际线，不再扫描
+        return self.search.search(rows, queue, start, board.hash, board.column_tops, geometry)
+
+    def play_piece(self, engine):
+        """选择落点并直接锁定当前方块，返回选择的落点"""
+        placement = self.choose(engine)
+        if placement is None:
+            engine.hard_drop()
+            return None
+        apply_placement(engine, placement)
+        return placement
+
+
+def apply_placement(engine, placement):
+    """把当前方块移动到搜索得到的落点并锁定（按硬降计分）"""
+    piece = engine.current_piece
+    distance = placement.y - piece.y
+    piece.set_rotation(placement.rotation)
+    piece.x = placement.x
+    piece.y = placement.y
+    if distance > 0:
+        engine.board.add_hard_drop_score(distance)
+    engine.lock_piece()
@@ -0,0 +1,139 @@
+"""
+资源管理器 - 后台线程读取字体和音乐文件，首帧先用占位资源绘制
+
+字体文件只读入内存一次，各字号的 pygame.font.Font 共享同一份数据；
+音乐从内存流式解码播放。磁盘读取在后台线程完成，创建字体和开始播放
+在主线程中进行（每帧调用 update()）。
+"""
+
+import io
+import os
+import queue
+import sys
+import threading
+import time
+
+import pygame
+
+FONT_FILE = os.path.join('assets', 'fonts', 'wqy-microhei-lite.ttc')
+MUSIC_FILE = os.path.join('assets', 'sounds', 'snowpanic.mp3')
+
+# 各用途的字号
+FONT_SIZES = {
+    'large': 18,
+    'medium': 14,
+    'small': 12,
+}
+
+MUSIC_VOLUME = 0.3
+
+# 资源名
+ASSET_FONT = 'font'
+ASSET_MUSIC = 'music'
+ASSET_LABELS = {ASSET_FONT: "字体", ASSET_MUSIC: "音乐"}
+
+
+def resource_path(relative):
+    """资源文件的绝对路径，兼容 PyInstaller 打包后的运行目录"""
+    if hasattr(sys, '_MEIPASS'):
+        base_path = sys._MEIPASS
+    else:
+        base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, relative)
+
+
+def _read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class AssetManager:
+    """按需加载的字体和背景音乐
+
+    构造时立即提供 pygame 默认字体作为占位，并在后台线程读取资源文件。
+    主线程每帧调用 update()，读取完成的字体替换占位字体（返回 True，调用方应整屏重绘），
+    音乐读取完成后开始循环播放。ready 记录每个资源从构造到可用的秒数。
+    """
+
+    def __init__(self, music=True, clock=time.perf_counter):
+        self.clock = clock
+        self.started = clock()
+        self.fonts = {name: pygame.font.Font(None, size) for name, size in FONT_SIZES.items()}
+        self.music_enabled = True
+        self.music_stream = None
+        self.ready = {}
+
+        jobs = [(ASSET_FONT, resource_path(FONT_FILE))]
+        if music:
+            jobs.append((ASSET_MUSIC, resource_path(MUSIC_FILE)))
+        self.pending = {name for name, _ in jobs}
+        self._results = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self._load, args=(jobs,), daemon=True)
+        self.thread.start()
+
+    def _load(self, jobs):
+        """后台线程：依次读入资源文件"""
+        for name, path in jobs:
+            try:
+                self._results.put((name, _read_file(path), None))
+            except OSError as e:
+                self._results.put((name, None, e))
+
+    @property
+    def loading(self):
+        """是否还有资源没有加载完"""
+        return bool(self.pending)
+
+    def update(self):
+        """处理后台读取完成的资源，字体发生更换时返回 True"""
+        changed = False
+        while self.pending:
+            try:
+                name, data, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending.discard(name)
+            self.ready[name] = self.clock() - self.started
+            if error is not None:
+                print(f"{ASSET_LABELS[name]}加载失败: {error}", file=sys.stderr)
+                continue
+            try:
+                if name == ASSET_FONT:
+                    self._apply_font(data)
+                    changed = True
+                else:
+                    self._play_music(data)
+            except pygame.error as e:
+                print(f"{ASSET_LABELS[name]}加载失败: {e}", file=sys.stderr)
+        return changed
+
+    def _apply_font(self, data):
+        # 每个 Font 需要自己的读取位置，BytesIO 与 data 共享同一块内存
+        self.fonts = {name: pygame.font.Font(io.BytesIO(data), size)
+                      for name, size in FONT_SIZES.items()}
+
+    def _play_music(self, data):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        # 播放期间 SDL 持续从这个流中读取，需要保留引用
+        self.music_stream = io.BytesIO(data)
+        pygame.mixer.music.load(self.music_stream, 'mp3')
+        pygame.mixer.music.set_volume(MUSIC_VOLUME)
+        pygame.mixer.music.play(-1)  # 循环播放
+        if not self.music_enabled:
+            pygame.mixer.music.pause()
+
+    def set_music_enabled(self, enabled):
+        """开关背景音乐，音乐尚未加载完时在开始播放后生效"""
+        self.music_enabled = enabled
+        if self.music_stream is None:
+            return
+        if enabled:
+            pygame.mixer.music.unpause()
+        else:
+            pygame.mixer.music.pause()
+
+    def wait(self, timeout=None):
+        """等待后台读取结束并处理结果（用于测试和基准）"""
+        self.thread.join(timeout)
+        return self.update()
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+性能基准 - 测量引擎热点路径，输出 JSON 并与基线比较
+
+    python benchmark.py run --output results.json
+    python benchmark.py compare baseline.json results.json --threshold 0.1
+
+所有用例使用固定种子生成的游戏板，多次运行结果可以直接比较。
+"""
+
+import argparse
+import contextlib
+import functools
+import gc
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+try:
+    from board import Board, GRID_WIDTH, GRID_HEIGHT
+    from bitboard import BitBoard
+    from tetromino import Tetromino, TetrominoPool, SHAPES
+    from engine import GameEngine, ACTION_NONE, ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE, ACTION_HARD_DROP
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, current_dir)
+    from board import Board, GRID_WIDTH, GRID_HEIGHT
+    from bitboard import BitBoard
+    from tetromino import Tetromino, TetrominoPool, SHAPES
+    from engine import GameEngine, ACTION_NONE, ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE, ACTION_HARD_DROP
+
+FORMAT_VERSION = 1
+
+# 每个用例至少运行的时间（秒）和重复次数，取最快的一次
+MIN_TIME = 0.2
+REPEAT = 5
+
+# 超过该比例变慢视为性能回退
+DEFAULT_THRESHOLD = 0.10
+
+BOARD_BACKENDS = {
+    'list': Board,
+    'bitboard': BitBoard,
+}
+
+# 压力测试用的大游戏板
+LARGE_BOARD = (40, 100)
+
+FIXTURE_COLOR = (128, 128, 128)
+FIXTURE_SEED = 20240601
+
+
+def _fill_rows(board, rows, rng, holes=1):
+    """用随机留空的格子填满给定行，保证这些行不会被消除"""
+    for y in rows:
+        empty = set(rng.sample(range(GRID_WIDTH), holes))
+        for x in range(GRID_WIDTH):
+            if x not in empty:
+                board.grid[y][x] = FIXTURE_COLOR
+
+
+def make_fixture(name, board_class=Board):
+    """按名称创建固定的测试游戏板
+
+    empty      空板
+    mid_game   下半部分参差不齐地填满
+    near_top   只剩顶部三行空间
+    tetris     底部四行只差最右一列，配合竖直的 I 方块可以消四行
+    """
+    rng = random.Random(f"{FIXTURE_SEED}-{name}")
+    board = board_class()
+    if name == 'mid_game':
+        _fill_rows(board, range(GRID_HEIGHT - 8, GRID_HEIGHT), rng, holes=2)
+    elif name == 'near_top':
+        _fill_rows(board, range(3, GRID_HEIGHT), rng, holes=2)
+    elif name == 'tetris':
+        _fill_rows(board, range(GRID_HEIGHT - 10, GRID_HEIGHT - 4), rng, holes=3)
+        for y in range(GRID_HEIGHT - 4, GRID_HEIGHT):
+            for x in range(GRID_WIDTH - 1):
+                board.grid[y][x] = FIXTURE_COLOR
+    elif name != 'empty':
+        raise ValueError(f"未知的测试游戏板: {name}")
+    board.sync()
+    return board
+
+
+def copy_board(board):
+    """复制游戏板，用于会修改游戏板的用例"""
+    clone = type(board)()
+    for y, row in enumerate(board.grid):
+        clone.grid[y][:] = row
+    clone.sync()
+    return clone
+
+
+FIXTURES = ('empty', 'mid_game', 'near_top', 'tetris')
+
+
+def sample_pieces(count, seed=FIXTURE_SEED):
+    """固定种子生成的一组方块，位置和旋转随机"""
+    rng = random.Random(seed)
+    pieces = []
+    for _ in range(count):
+        piece = Tetromino(shape=rng.randrange(len(SHAPES)), rotation=rng.randrange(4))
+        piece.x = rng.randrange(-1, GRID_WIDTH - 1)
+        piece.y = rng.randrange(-1, GRID_HEIGHT - 1)
+        pieces.append(piece)
+    return pieces
+
+
+def time_case(func, setup=None, min_time=MIN_TIME, repeat=REPEAT):
+    """测量 func 每次调用的耗时
+
+    func(state, n) 执行 n 次操作；setup(n) 在计时之外准备 state（例如复制 n 个游戏板）。
+    返回每次操作的纳秒数统计。与 timeit 一样，计时期间关闭垃圾回收。
+    """
+    def measure(n):
+        state = setup(n) if setup else None
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func(state, n)
+            return time.perf_counter() - start
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    n = 1
+    while True:
+        elapsed = measure(n)
+        if elapsed >= min_time / repeat or n >= 1 << 24:
+            break
+        n *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / repeat / elapsed) + 1))
+
+    samples = [measure(n) / n * 1e9 for _ in range(repeat)]
+    best = min(samples)
+    return {
+        'ns_per_op': best,
+        'median_ns': statistics.median(samples),
+        'ops_per_second': 1e9 / best,
+        'ops': n,
+        'repeat': repeat,
+    }
+
+
+def bench_is_valid_position(board):
+    pieces = sample_pieces(256)
+
+    def run(_, n):
+        check = board.is_valid_position
+        for i in range(n):
+            check(pieces[i & 255])
+    return run, None
+
+
+def _dropped_pieces(board):
+    """在各列硬降的方块，落点在计时之外算好"""
+    pieces = []
+    for piece in sample_pieces(64):
+        piece.y = 0
+        if not board.is_valid_position(piece):
+            continue
+        while board.is_valid_position(piece, y_offset=1):
+            piece.y += 1
+        pieces.append(piece)
+    return pieces or sample_pieces(1)
+
+
+def bench_place_tetromino(board):
+    pieces = _dropped_pieces(board)
+
+    def setup(n):
+        return [copy_board(board) for _ in range(n)]
+
+    def run(boards, n):
+        for i in range(n):
+            boards[i].place_tetromino(pieces[i % len(pieces)])
+    return run, setup
+
+
+def bench_place_undo(board):
+    # 试探走法：放置（可能消行）后用撤销日志恢复，同一个游戏板反复使用
+    pieces = _dropped_pieces(board)
+    board = copy_board(board)
+    mark = board.snapshot()
+    place = board.place_tetromino
+    restore = board.restore
+
+    def run(_, n):
+        for i in range(n):
+            place(pieces[i % len(pieces)])
+            restore(mark)
+    return run, None
+
+
+def bench_clone_place(board):
+    # 写时复制：克隆后放置一个方块，只复制方块所在的行
+    pieces = _dropped_pieces(board)
+
+    def run(_, n):
+        for i in range(n):
+            board.clone().place_tetromino(pieces[i % len(pieces)])
+    return run, None
+
+
+def bench_clear_lines(board):
+    full = copy_board(board)
+    # tetris 用例补上最右一列，其余用例填满最底行
+    rows = range(GRID_HEIGHT - 4, GRID_HEIGHT) if all(full.grid[-1][:-1]) else (GRID_HEIGHT - 1,)
+    for y in rows:
+        full.grid[y] = [FIXTURE_COLOR] * GRID_WIDTH
+    full.sync()
+
+    def setup(n):
+        return [copy_board(full) for _ in range(n)]
+
+    def run(boards, n):
+        for i in range(n):
+            boards[i].clear_lines()
+    return run, setup
+
+
+def bench_landing_row(board):
+    # 出生行上可以放下的方块，反复查询同一游戏板上的落点（硬降和落点预览的用法）
+    pieces = []
+    for piece in sample_pieces(64):
+        piece.y = 0
+        if board.is_valid_position(piece):
+            pieces.append(piece)
+    pieces = pieces or sample_pieces(1)
+
+    def run(_, n):
+        landing_row = board.landing_row
+        for i in range(n):
+            landing_row(pieces[i % len(pieces)])
+    return run, None
+
+
+def bench_rotate():
+    pieces = sample_pieces(256)
+
+    def run(_, n):
+        for i in range(n):
+            pieces[i & 255].rotate()
+    return run, None
+
+
+def bench_get_blocks():
+    pieces = sample_pieces(256)
+
+    def run(_, n):
+        for i in range(n):
+            pieces[i & 255].get_blocks()
+    return run, None
+
+
+def bench_spawn():
+    # 与 GameEngine.spawn_piece 相同：归还旧方块，再取出一个新方块
+    pool = TetrominoPool()
+    board = Board()
+    shapes = [piece.shape_index for piece in sample_pieces(256)]
+
+    def run(_, n):
+        piece = pool.acquire(shape=shapes[0], board=board)
+        for i in range(n):
+            pool.release(piece)
+            piece = pool.acquire(shape=shapes[i & 255], board=board)
+    return run, None
+
+
+def random_actions(seed, frames):
+    """固定种子的随机输入：大部分帧不操作，偶尔移动、旋转或硬降"""
+    rng = random.Random(seed)
+    choices = (ACTION_NONE,) * 6 + (ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE, ACTION_HARD_DROP)
+    return [rng.choice(choices) for _ in range(frames)]
+
+
+def bench_headless_game(board_class):
+    actions = random_actions(FIXTURE_SEED, 20000)
+
+    def run(_, n):
+        for i in range(n):
+            GameEngine(board_class, seed=FIXTURE_SEED + i).run(actions)
+    return run, None
+
+
+def bench_draw(board_class, full):
+    """在 dummy 视频驱动下测量 TetrisGame.draw 每帧耗时"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    with contextlib.redirect_stdout(io.StringIO()):
+        from game import TetrisGame
+        game = TetrisGame(board_class, seed=FIXTURE_SEED)
+    actions = random_actions(FIXTURE_SEED, 4096)
+    draw = game.renderer.draw_full if full else game.draw
+
+    def run(_, n):
+        for i in range(n):
+            if game.game_over:
+                game.reset_game(FIXTURE_SEED)
+            game.step(actions[i & 4095])
+            draw()
+    return run, None
+
+
+def bench_startup():
+    """创建 TetrisGame 并绘制、提交第一帧（不含模块导入和资源加载）"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    from game import TetrisGame
+
+    def run(_, n):
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            for i in range(n):
+                game = TetrisGame(seed=FIXTURE_SEED, music=False)
+                game.renderer.draw()
+                game.assets.thread.join()
+    return run, None
+
+
+def build_cases(include_draw=True):
+    """返回 {用例名: 工厂函数}，工厂返回 (run, setup)"""
+    cases = {}
+    for backend, board_class in BOARD_BACKENDS.items():
+        for fixture in FIXTURES:
+            make = lambda b=board_class, f=fixture: make_fixture(f, b)
+            cases[f'is_valid_position/{backend}/{fixture}'] = lambda m=make: bench_is_valid_position(m())
+            cases[f'place_tetromino/{backend}/{fixture}'] = lambda m=make: bench_place_tetromino(m())
+            cases[f'clear_lines/{backend}/{fixture}'] = lambda m=make: bench_clear_lines(m())
+            cases[f'place_undo/{backend}/{fixture}'] = lambda m=make: bench_place_undo(m())
+            cases[f'clone_place/{backend}/{fixture}'] = lambda m=make: bench_clone_place(m())
+            cases[f'landing_row/{backend}/{fixture}'] = lambda m=make: bench_landing_row(m())
+        cases[f'headless_game/{backend}'] = lambda b=board_class: bench_headless_game(b)
+        large = functools.partial(board_class, *LARGE_BOARD)
+        cases[f'headless_game/{backend}/{LARGE_BOARD[0]}x{LARGE_BOARD[1]}'] = \
+            lambda b=large: bench_headless_game(b)
+    cases['tetromino/rotate'] = bench_rotate
+    cases['tetromino/get_blocks'] = bench_get_blocks
+    cases['tetromino/spawn'] = bench_spawn
+    if include_draw:
+        cases['draw/incremental'] = lambda: bench_draw(Board, full=False)
+        cases['draw/full'] = lambda: bench_draw(Board, full=True)
+        cases['startup/first_frame'] = bench_startup
+        cases[f'draw/incremental/{LARGE_BOARD[0]}x{LARGE_BOARD[1]}'] = \
+            lambda: bench_draw(functools.partial(Board, *LARGE_BOARD), full=False)
+    return cases
+
+
+def run_benchmarks(pattern=None, include_draw=True, min_time=MIN_TIME, repeat=REPEAT, verbose=True):
+    """运行匹配 pattern 的用例，返回可直接写成 JSON 的结果"""
+    results = {}
+    for name, factory in build_cases(include_draw).items():
+        if pattern and pattern not in name:
+            continue
+        func, setup = factory()
+        results[name] = result = time_case(func, setup, min_time, repeat)
+        if verbose:
+            print(f"{name:<40} {format_time(result['ns_per_op']):>12}", file=sys.stderr)
+    return {
+        'version': FORMAT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+def format_time(ns):
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} µs"
+    return f"{ns:.0f} ns"
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, report_missing=True):
+    """比较两次结果，返回 (报告行列表, 回退的用例名列表)
+
+    report_missing 为 False 时不列出只在基线中出现的用例（例如只运行了部分用例）。
+    """
+    lines = []
+    regressions = []
+    base_results = baseline['results']
+    for name, result in current['results'].items():
+        base = base_results.get(name)
+        if base is None:
+            lines.append(f"{name:<40} {format_time(result['ns_per_op']):>12}   (新增)")
+            continue
+        ratio = result['ns_per_op'] / base['ns_per_op'] - 1
+        mark = ''
+        if ratio > threshold:
+            mark = '  ❌ 回退'
+            regressions.append(name)
+        elif ratio < -threshold:
+            mark = '  ✅ 提升'
+        lines.append(f"{name:<40} {format_time(base['ns_per_op']):>12} -> "
+                     f"{format_time(result['ns_per_op']):>12} {ratio:+7.1%}{mark}")
+    for name in base_results:
+        if report_missing and name not in current['results']:
+            lines.append(f"{name:<40} (缺失)")
+    return lines, regressions
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="俄罗斯方块性能基准")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="运行基准测试")
+    run_parser.add_argument('--output', default=None, help="JSON 输出文件，默认输出到标准输出")
+    run_parser.add_argument('--filter', default=None, help="只运行名称包含该字符串的用例")
+    run_parser.add_argument('--no-draw', action='store_true', help="跳过需要 pygame 的绘制用例")
+    run_parser.add_argument('--min-time', type=float, default=MIN_TIME, help="每个用例的最短运行时间（秒）")
+    run_parser.add_argument('--repeat', type=int, default=REPEAT, help="重复次数，取最快的一次")
+    run_parser.add_argument('--baseline', default=None, help="运行后与该基线比较")
+    run_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help="变慢超过该比例视为回退")
+
+    compare_parser = commands.add_parser('compare', help="比较两次结果")
+    compare_parser.add_argument('baseline', help="基线 JSON")
+    compare_parser.add_argument('current', help="当前 JSON")
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help="变慢超过该比例视为回退")
+    return parser.parse_args()
+
+
+def report(baseline, current, threshold, report_missing=True):
+    lines, regressions = compare(baseline, current, threshold, report_missing)
+    print("\n".join(lines))
+    if regressions:
+        print(f"{len(regressions)} 个用例变慢超过 {threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main():
+    args = parse_args()
+
+    if args.command == 'compare':
+        return report(load_results(args.baseline), load_results(args.current), args.threshold)
+
+    results = run_benchmarks(args.filter, not args.no_draw, args.min_time, args.repeat)
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    elif not args.baseline:
+        print(text)
+
+    if args.baseline:
+        return report(load_results(args.baseline), results, args.threshold, not args.filter)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
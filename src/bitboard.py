@@ -0,0 +1,243 @@
+from functools import lru_cache
+
+try:
+    from board import (GRID_WIDTH, GRID_HEIGHT, SPAWN_BUFFER, HASH_BITS, HASH_MASK,
+                       Board, RowView, column_keys)
+    from tetromino import CELL_OFFSETS
+except ImportError:
+    import os
+    import sys
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, current_dir)
+    from board import (GRID_WIDTH, GRID_HEIGHT, SPAWN_BUFFER, HASH_BITS, HASH_MASK,
+                       Board, RowView, column_keys)
+    from tetromino import CELL_OFFSETS
+
+
+def _build_masks(cells, width):
+    """为一个旋转状态预计算每一列的行掩码"""
+    row_bits = {}
+    for x, y in cells:
+        row_bits[y] = row_bits.get(y, 0) | (1 << x)
+    max_x = max(x for x, _ in cells)
+
+    # 第 x 项是方块左上角位于第 x 列时各行的掩码，越界的列为 None
+    masks = [None] * width
+    for x in range(width - max_x):
+        masks[x] = tuple((y, bits << x) for y, bits in sorted(row_bits.items()))
+    return tuple(masks)
+
+
+@lru_cache(maxsize=None)
+def piece_masks(width):
+    """为所有形状和旋转状态预计算掩码，按 [方块类型][旋转状态][列] 索引"""
+    return tuple(
+        tuple(_build_masks(cells, width) for cells in rotations)
+        for rotations in CELL_OFFSETS
+    )
+
+
+@lru_cache(maxsize=None)
+def packed_masks(width):
+    """整个方块打包成一个整数的掩码，第 dy 行位于第 dy×width 位起，按 [方块类型][旋转状态][列] 索引
+
+    每项为 (掩码, 最低一行的 dy)，越界的列为 None。
+    """
+    return tuple(
+        tuple(
+            tuple(None if rows is None else
+                  (sum(mask << (y * width) for y, mask in rows), rows[-1][0])
+                  for rows in column_masks)
+            for column_masks in rotations)
+        for rotations in piece_masks(width)
+    )
+
+
+@lru_cache(maxsize=None)
+def mask_cells(width):
+    """方块各行的掩码到 (占用的列, 行键) 的映射，放置方块时按行写入"""
+    keys = column_keys(width)
+    cells = {}
+    for rotations in piece_masks(width):
+        for column_masks in rotations:
+            for rows in column_masks:
+                for _, mask in rows or ():
+                    columns = tuple(x for x in range(width) if mask >> x & 1)
+                    row_key = 0
+                    for x in columns:
+                        row_key ^= keys[x]
+                    cells[mask] = (columns, row_key)
+    return cells
+
+
+class BitBoard(Board):
+    """位板实现：每行一个整数掩码，颜色单独存放
+
+    掩码与颜色行存放在同样排列的环形缓冲区中，消行时一起移动。
+    rows（可见行）和 hidden_rows（隐藏行）是按逻辑行号访问掩码的视图。
+    packed 把所有行按逻辑顺序打包成一个整数，第 y 行位于第 (y + buffer)×width 位起，
+    碰撞检测只需一次与运算；消行时按被消除的行拆开重新拼接，不随环形缓冲区移动。
+    公开接口与 Board 完全相同，TetrisGame 可以任选其一。
+    """
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT, buffer=SPAWN_BUFFER):
+        super().__init__(width, height, buffer)
+        self.full_row = (1 << width) - 1
+        self.masks = piece_masks(width)
+        self.packed_masks = packed_masks(width)
+        self.mask_cells = mask_cells(width)
+        self.bits = [0] * self.total_rows
+        self.packed = 0
+        self.rows = RowView(self, self.bits, 0, height)
+        self.hidden_rows = RowView(self, self.bits, -buffer, buffer)
+
+    def is_valid_position(self, tetromino, x_offset=0, y_offset=0):
+        """检查位置是否有效"""
+        x = tetromino.x + x_offset
+        if x < 0 or x >= self.width:
+            return False
+        entry = self.packed_masks[tetromino.shape_index][tetromino.rotation][x]
+        if entry is None:
+            return False
+        mask, bottom = entry
+        top = tetromino.y + y_offset
+        if top + bottom >= self.height:
+            return False
+        shift = (top + self.buffer) * self.width
+        if shift < 0:
+            # 缓冲区之上的行不检查
+            return not self.packed & (mask >> -shift)
+        return not self.packed & (mask << shift)
+
+    def place_tetromino(self, tetromino):
+        """将方块放置到板上"""
+        if self.journal is not None or self.owned is not None:
+            self._prepare_rows(tetromino)
+        top = -self.buffer
+        bits = self.bits
+        slots = self.slots
+        row_keys = self.row_keys
+        column_tops = self.column_tops
+        row_slots = self.row_slots
+        mask_cells = self.mask_cells
+        color = tetromino.color
+        piece_y = tetromino.y
+        value = self.hash
+        packed = self.packed
+        width = self.width
+        lowest = top - 1
+        # 按行写入：每行一次掩码、packed、行键和哈希（行键循环左移 y 位），只有颜色和列高度逐格更新
+        for y, mask in self.masks[tetromino.shape_index][tetromino.rotation][tetromino.x]:
+            board_y = piece_y + y
+            if board_y < top:  # 确保不在缓冲区之外
+                continue
+            slot = row_slots[board_y]
+            bits[slot] |= mask
+            packed |= mask << ((board_y - top) * width)
+            columns, key = mask_cells[mask]
+            row_keys[slot] ^= key
+            shift = board_y % HASH_BITS
+            value ^= ((key << shift) | (key >> (HASH_BITS - shift))) & HASH_MASK
+            row = slots[slot]
+            for column in columns:
+                row[column] = color
+                if board_y < column_tops[column]:
+                    column_tops[column] = board_y
+            if board_y < self.top:
+                self.top = board_y
+            lowest = board_y
+        self.hash = value
+        self.packed = packed
+        self.landing_cache.clear()
+
+        # 只有方块所在的行可能被填满
+        lines_cleared = self.clear_lines(range(max(tetromino.y, top), lowest + 1))
+
+        # 更新统计信息
+        self.update_stats(lines_cleared)
+
+        return lines_cleared
+
+    def _full_rows(self, rows):
+        """rows 中已填满的行，按行号升序"""
+        bits = self.bits
+        full_row = self.full_row
+        row_slots = self.row_slots
+        return [y for y in rows if bits[row_slots[y]] == full_row]
+
+    def _remove_rows(self, lines):
+        """去掉 packed 中被消除的行，上方的行整体移到高位；相邻的被消除行一次去掉"""
+        super()._remove_rows(lines)
+        packed = self.packed
+        width = self.width
+        buffer = self.buffer
+        index = 0
+        while index < len(lines):
+            end = index + 1
+            while end < len(lines) and lines[end] == lines[end - 1] + 1:
+                end += 1
+            # 从上往下处理，下方的被消除行不受影响
+            low = (lines[index] + buffer) * width
+            high = (lines[end - 1] + 1 + buffer) * width
+            packed = ((packed & ((1 << low) - 1)) << (high - low)) | (packed >> high << high)
+            index = end
+        self.packed = packed
+
+    def _pack_rows(self):
+        """按逻辑行号重新拼出 packed"""
+        bits = self.bits
+        row_slots = self.row_slots
+        width = self.width
+        packed = 0
+        for index, y in enumerate(range(-self.buffer, self.height)):
+            packed |= bits[row_slots[y]] << (index * width)
+        self.packed = packed
+
+    def add_garbage(self, count, hole):
+        overflow = super().add_garbage(count, hole)
+        self._pack_rows()
+        return overflow
+
+    def _move_rows(self, moves, cleared, freed):
+        """颜色行和掩码一起移动"""
+        super()._move_rows(moves, cleared, freed)
+        bits = self.bits
+        for target, source in moves:
+            bits[target] = bits[source]
+        for slot in freed:
+            bits[slot] = 0
+
+    def _fill_garbage_row(self, slot, hole):
+        super()._fill_garbage_row(slot, hole)
+        self.bits[slot] = self.full_row & ~(1 << hole)
+
+    def _sync_rows(self):
+        """直接修改 grid 中的格子之后，重新计算行键和掩码"""
+        super()._sync_rows()
+        for slot, row in enumerate(self.slots):
+            self.bits[slot] = sum(1 << x for x, cell in enumerate(row) if cell)
+        self._pack_rows()
+
+    def _save_rows(self, slots, contents):
+        """撤销日志同时记录掩码和 packed，掩码列表很短，整个复制比逐个槽位记录快"""
+        return super()._save_rows(slots, contents), self.bits[:], self.packed
+
+    def _load_rows(self, rows):
+        rows, bits, self.packed = rows
+        super()._load_rows(rows)
+        self.bits[:] = bits
+
+    def clone(self):
+        """写时复制的副本，掩码是整数，直接复制整个列表"""
+        clone = super().clone()
+        clone.bits = self.bits[:]
+        clone.rows = RowView(clone, clone.bits, 0, self.height)
+        clone.hidden_rows = RowView(clone, clone.bits, -self.buffer, self.buffer)
+        return clone
+
+    def reset(self):
+        """重置游戏板"""
+        super().reset()
+        for slot in range(self.total_rows):
+            self.bits[slot] = 0
+        self.packed = 0
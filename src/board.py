@@ -1,68 +1,503 @@
-# 直接定义常量
+import copy
+import random
+from functools import lru_cache
+from itertools import chain
+
+# 默认游戏板尺寸；实际尺寸由 Board 的构造参数决定
 GRID_WIDTH = 10
 GRID_HEIGHT = 20
+SPAWN_BUFFER = 0        # 第 0 行上方隐藏的出生缓冲行数
 
 SCORE_SINGLE = 100      # 单行消除
 SCORE_DOUBLE = 300      # 双行消除
 SCORE_TRIPLE = 500      # 三行消除
 SCORE_TETRIS = 800      # 四行消除
 
+GARBAGE_COLOR = (150, 150, 150)     # 对战中对手送来的垃圾行
+
+
+HASH_BITS = 64
+HASH_MASK = (1 << HASH_BITS) - 1
+
+
+def rotate_key(value, shift):
+    """64 位循环左移，shift 可以为负"""
+    shift %= HASH_BITS
+    return ((value << shift) | (value >> (HASH_BITS - shift))) & HASH_MASK
+
+
+@lru_cache(maxsize=None)
+def column_keys(width):
+    """每列一个 64 位随机数，使用固定种子，保证不同进程和版本之间哈希一致"""
+    rng = random.Random(0x7E7215)
+    return tuple(rng.getrandbits(64) for _ in range(width))
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(width, height, buffer=0):
+    """Zobrist 键：局面哈希为所有已占用格子键的异或
+
+    第 y 行第 x 列的键是 column_keys[x] 循环左移 y 位，因此一行的哈希就是该行的行键
+    （已占用列的 column_keys 异或）循环左移 y 位，整行移动 k 行只需再移 k 位，
+    消行时不用逐格重新计算。代价是同一列相隔 64 行的两格键相同，只影响高于 64 行的游戏板。
+    表中前 height 行对应可见行，其后是隐藏缓冲行，因此第 y 行（y 可以为负）的键就是 keys[y]。
+    """
+    columns = column_keys(width)
+    return tuple(
+        tuple(rotate_key(key, y) for key in columns)
+        for y in chain(range(height), range(-buffer, 0))
+    )
+
+
+class RowView:
+    """环形缓冲区中一段连续逻辑行的列表式视图
+
+    view[y] 按当前基准槽位换算到环形缓冲区中的槽位，负数下标与列表相同，从末尾数起。
+    """
+
+    __slots__ = ('board', 'ring', 'first', 'count')
+
+    def __init__(self, board, ring, first, count):
+        self.board = board
+        self.ring = ring
+        self.first = first
+        self.count = count
+
+    def _slot(self, y):
+        if y < 0:
+            y += self.count
+        if not 0 <= y < self.count:
+            raise IndexError("行号越界")
+        return self.board.row_slots[self.first + y]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, y):
+        return self.ring[self._slot(y)]
+
+    def __setitem__(self, y, value):
+        self.ring[self._slot(y)] = value
+
+    def __iter__(self):
+        if not self.count:
+            return iter(())
+        start = self._slot(0)
+        end = start + self.count
+        if end <= len(self.ring):
+            return iter(self.ring[start:end])
+        return chain(self.ring[start:], self.ring[:end - len(self.ring)])
+
+
 class Board:
-    def __init__(self):
-        self.grid = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+    """游戏板
+
+    width 列、height 个可见行，以及第 0 行上方 buffer 个隐藏行。所有行在构造时分配，
+    存放在环形缓冲区 slots 中；grid 和 hidden 是按逻辑行号访问的视图。
+    snapshot()/restore() 撤销试探的走法，clone() 返回写时复制的副本。
+    直接修改 grid 中的格子后需调用 sync()。
+    """
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT, buffer=SPAWN_BUFFER):
+        self.width = width
+        self.height = height
+        self.buffer = buffer
+        self.total_rows = height + buffer
+        self.spawn_y = -buffer
+        self.zobrist = zobrist_keys(width, height, buffer)
+        self.column_keys = column_keys(width)
+        self.garbage_key = 0
+        for key in self.column_keys:
+            self.garbage_key ^= key
+        self.empty_row = (0,) * width
+        self.slots = [[0] * width for _ in range(self.total_rows)]
+        self.row_keys = [0] * self.total_rows     # 每个槽位上的行键，随行一起移动
+        self.slot_cycle = list(range(self.total_rows)) * 2
+        self._set_base(0)
+        self.top = height
+        self.column_tops = [height] * width
+        self.landing_cache = {}
+        self.grid = RowView(self, self.slots, 0, height)
+        self.hidden = RowView(self, self.slots, -buffer, buffer)
         self.score = 0
         self.level = 1
         self.lines_cleared = 0
         self.total_lines = 0
+        self.hash = 0
+        self.journal = None     # 撤销日志，snapshot() 之后才记录
+        self.owned = None       # 写时复制：None 表示没有与其他游戏板共享的行
+    
+    def _set_base(self, base):
+        """移动环形缓冲区的基准槽位，并重建 row_slots（可见行在前，隐藏行在末尾）"""
+        self.base = base
+        self.offset = offset = base + self.buffer
+        cycle = self.slot_cycle
+        self.row_slots = cycle[offset:offset + self.height] + cycle[base:offset]
+    
+    def snapshot(self):
+        """开始（或继续）记录撤销日志，返回传给 restore() 的标记"""
+        if self.journal is None:
+            self.journal = []
+        return len(self.journal)
+    
+    def restore(self, mark=0):
+        """撤销 mark 之后的所有修改"""
+        journal = self.journal
+        while len(journal) > mark:
+            self._undo(journal.pop())
+        self.landing_cache.clear()
+    
+    def commit(self):
+        """保留所有修改并停止记录撤销日志"""
+        self.journal = None
+    
+    def _record(self, slots=(), contents=()):
+        """在撤销日志中记录当前状态，以及 slots 中槽位上的行，contents 中的槽位同时记录内容"""
+        self.journal.append((
+            (self.score, self.level, self.lines_cleared, self.total_lines,
+             self.hash, self.top, self.base, self.offset),
+            self.column_tops[:],
+            self.row_keys[:],
+            self._save_rows(slots, contents),
+        ))
+    
+    def _save_rows(self, slots, contents):
+        ring = self.slots
+        owned = self.owned
+        return [(slot, ring[slot], tuple(ring[slot]) if slot in contents else None,
+                 owned[slot] if owned is not None else None)
+                for slot in slots]
+    
+    def _undo(self, entry):
+        state, column_tops, row_keys, rows = entry
+        base = self.base
+        (self.score, self.level, self.lines_cleared, self.total_lines,
+         self.hash, self.top, self.base, self.offset) = state
+        if self.base != base:
+            self._set_base(self.base)
+        self.column_tops[:] = column_tops
+        self.row_keys[:] = row_keys
+        self._load_rows(rows)
+    
+    def _load_rows(self, rows):
+        ring = self.slots
+        owned = self.owned
+        for slot, row, contents, flag in rows:
+            # 共享的行写入前已经换成副本，原来的行没有被改动；私有的行是原地写入的，
+            # 之前的日志项可能按引用恢复它，所以内容必须写回同一个行对象
+            if contents is not None and (owned is None or flag):
+                row[:] = contents
+            ring[slot] = row
+            if owned is not None:
+                owned[slot] = flag
+    
+    def clone(self):
+        """写时复制的副本，两个游戏板此后都要先复制共享的行再写入
+
+        正在记录撤销日志的游戏板不能克隆。
+        """
+        if self.journal:
+            raise RuntimeError("记录撤销日志期间不能克隆游戏板")
+        clone = copy.copy(self)
+        clone.slots = self.slots[:]
+        clone.row_keys = self.row_keys[:]
+        clone.grid = RowView(clone, clone.slots, 0, self.height)
+        clone.hidden = RowView(clone, clone.slots, -self.buffer, self.buffer)
+        clone.column_tops = self.column_tops[:]
+        clone.landing_cache = {}
+        clone.journal = None
+        self.owned = [False] * self.total_rows
+        clone.owned = [False] * self.total_rows
+        return clone
+    
+    def _writable_row(self, slot):
+        """返回可以原地写入的行，共享的行先换成私有副本"""
+        owned = self.owned
+        if owned is not None and not owned[slot]:
+            self.slots[slot] = list(self.slots[slot])
+            owned[slot] = True
+        return self.slots[slot]
+    
+    def _prepare_rows(self, tetromino):
+        """放置方块之前：记录方块所在的行，并确保这些行可以原地写入"""
+        top = -self.buffer
+        row_slots = self.row_slots
+        slots = {row_slots[tetromino.y + y] for _, y in tetromino.cells if tetromino.y + y >= top}
+        if self.journal is not None:
+            self._record(slots, slots)
+        if self.owned is not None:
+            for slot in slots:
+                self._writable_row(slot)
     
     def is_valid_position(self, tetromino, x_offset=0, y_offset=0):
         """检查位置是否有效"""
-        for y, row in enumerate(tetromino.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    new_x = tetromino.x + x + x_offset
-                    new_y = tetromino.y + y + y_offset
-                    
-                    # 检查边界
-                    if new_x < 0 or new_x >= GRID_WIDTH or new_y >= GRID_HEIGHT:
-                        return False
-                    
-                    # 检查碰撞（只检查网格内的位置）
-                    if new_y >= 0 and self.grid[new_y][new_x]:
-                        return False
+        base_x = tetromino.x + x_offset
+        base_y = tetromino.y + y_offset
+        width = self.width
+        top = -self.buffer
+        slots = self.slots
+        row_slots = self.row_slots
+        for x, y in tetromino.cells:
+            new_x = base_x + x
+            new_y = base_y + y
+            
+            # 检查边界
+            if new_x < 0 or new_x >= width or new_y >= self.height:
+                return False
+            
+            # 检查碰撞（缓冲区之上的位置不检查）
+            if new_y >= top and slots[row_slots[new_y]][new_x]:
+                return False
         return True
     
+    def landing_row(self, tetromino):
+        """方块从当前位置垂直落下后所在的行
+
+        方块的每个格子都在所在列的最高方块之上时（正常下落都是如此），
+        落点只取决于列高度，按 (方块类型, 旋转状态, 列) 查缓存；
+        方块已经塞到悬空方块下方时逐行检查。
+        """
+        key = (tetromino.shape_index, tetromino.rotation, tetromino.x)
+        row = self.landing_cache.get(key)
+        if row is None:
+            column_tops = self.column_tops
+            base_x = tetromino.x
+            row = self.landing_cache[key] = min(
+                column_tops[base_x + x] - y for x, y in tetromino.cells) - 1
+        if tetromino.y <= row:
+            return row
+        row = tetromino.y
+        while self.is_valid_position(tetromino, y_offset=row + 1 - tetromino.y):
+            row += 1
+        return row
+    
     def place_tetromino(self, tetromino):
         """将方块放置到板上"""
-        for y, row in enumerate(tetromino.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    board_y = tetromino.y + y
-                    if board_y >= 0:  # 确保不在顶部之外
-                        self.grid[board_y][tetromino.x + x] = tetromino.color
+        if self.journal is not None or self.owned is not None:
+            self._prepare_rows(tetromino)
+        top = -self.buffer
+        slots = self.slots
+        row_keys = self.row_keys
+        column_keys = self.column_keys
+        column_tops = self.column_tops
+        row_slots = self.row_slots
+        lowest = top - 1
+        for x, y in tetromino.cells:
+            board_y = tetromino.y + y
+            if board_y >= top:  # 确保不在缓冲区之外
+                slot = row_slots[board_y]
+                slots[slot][tetromino.x + x] = tetromino.color
+                row_keys[slot] ^= column_keys[tetromino.x + x]
+                self.hash ^= self.zobrist[board_y][tetromino.x + x]
+                if board_y < self.top:
+                    self.top = board_y
+                if board_y > lowest:
+                    lowest = board_y
+                if board_y < column_tops[tetromino.x + x]:
+                    column_tops[tetromino.x + x] = board_y
+        self.landing_cache.clear()
         
-        # 检查并清除完整的行
-        lines_cleared = self.clear_lines()
+        # 只有方块所在的行可能被填满
+        lines_cleared = self.clear_lines(range(max(tetromino.y, top), lowest + 1))
         
         # 更新统计信息
         self.update_stats(lines_cleared)
         
         return lines_cleared
     
-    def clear_lines(self):
-        """清除完整的行并返回清除的行数"""
-        lines_to_clear = []
+    def _full_rows(self, rows):
+        """rows 中已填满的行，按行号升序"""
+        slots = self.slots
+        row_slots = self.row_slots
+        return [y for y in rows if all(slots[row_slots[y]])]
+    
+    def clear_lines(self, rows=None):
+        """清除完整的行并返回清除的行数
+
+        rows 为需要检查的行（升序），默认检查 top 以下的所有行；隐藏行填满时同样消除。
+        """
+        if rows is None:
+            rows = range(self.top, self.height)
+        lines_to_clear = self._full_rows(rows)
+        if not lines_to_clear:
+            return 0
+        
+        self.hash = self._cleared_hash(lines_to_clear)
+        self._remove_rows(lines_to_clear)
+        self._clear_skyline(lines_to_clear)
+        return len(lines_to_clear)
+    
+    def _cleared_hash(self, lines):
+        """消除 lines（升序）之后的哈希
+
+        与 _remove_rows 选择同一侧：上方较少时逐行计算 top 到最低被消除行的变化；
+        下方较少时逐行计算第一个被消除行以下的部分，上方的行整体下移 count 行，
+        它们的哈希之和由总哈希异或得到，再循环移位 count 位。
+        """
+        count = len(lines)
+        first = lines[0]
+        last = lines[-1]
+        upper = last - self.top <= self.height - 1 - first
+        start, end = (self.top, last + 1) if upper else (first, self.height)
         
-        for y in range(GRID_HEIGHT):
-            if all(self.grid[y]):
-                lines_to_clear.append(y)
+        row_keys = self.row_keys
+        row_slots = self.row_slots
+        old = new = 0
+        shift = count       # 当前行下方还有几行被消除，即该行下移的行数
+        index = 0
+        for y in range(start, end):
+            key = row_keys[row_slots[y]]
+            if index < count and y == lines[index]:
+                old ^= rotate_key(key, y)
+                shift -= 1
+                index += 1
+            elif key:
+                old ^= rotate_key(key, y)
+                new ^= rotate_key(key, y + shift)
+        if upper:
+            return self.hash ^ old ^ new
+        return rotate_key(self.hash ^ old, count) ^ new
+    
+    def _clear_skyline(self, lines):
+        """消行后更新列高度
+
+        被消除的行是满行，每列最高的方块不会低于第一个被消除行：高于它的列整体下移，
+        恰好在这一行的列（这一格已被消除）从下移后的位置向下重新扫描。
+        """
+        first = lines[0]
+        count = len(lines)
+        column_tops = self.column_tops
+        slots = self.slots
+        row_slots = self.row_slots
+        for x, top in enumerate(column_tops):
+            if top < first:
+                column_tops[x] = top + count
+                continue
+            # 下移后第一个被消除行之上 count 行以内都来自原来的空格
+            for y in range(first + count, self.height):
+                if slots[row_slots[y]][x]:
+                    column_tops[x] = y
+                    break
+            else:
+                column_tops[x] = self.height
+        self.landing_cache.clear()
+    
+    def _remove_rows(self, lines):
+        """从环形缓冲区中移除 lines（升序），上方的行整体下移，顶部补上清零的原行"""
+        row_slots = self.row_slots
+        count = len(lines)
+        first = lines[0]
+        last = lines[-1]
+        cleared = [row_slots[y] for y in lines]
         
-        # 从下往上清除行
-        for line in sorted(lines_to_clear, reverse=True):
-            del self.grid[line]
-            self.grid.insert(0, [0 for _ in range(GRID_WIDTH)])
+        moves = []
+        if last - self.top <= self.height - 1 - first:
+            # 把 top 到 last 之间保留的行逐个下移，top 之上都是空行，无需移动
+            target = last
+            for y in range(last, self.top - 1, -1):
+                if y not in lines:
+                    moves.append((row_slots[target], row_slots[y]))
+                    target -= 1
+            freed = [row_slots[y] for y in range(self.top, self.top + count)]
+            shift = 0
+        else:
+            # 把 first 之下保留的行逐个上移，空出最底部的 count 个槽位；
+            # 再把 base 前移 count，这些槽位就成为顶部的新行，上方的行不用移动
+            target = first
+            for y in range(first, self.height):
+                if y not in lines:
+                    moves.append((row_slots[target], row_slots[y]))
+                    target += 1
+            freed = row_slots[self.height - count:self.height]
+            shift = count
         
-        return len(lines_to_clear)
+        if self.journal is not None:
+            self._record([target for target, _ in moves] + freed, cleared)
+        self._move_rows(moves, cleared, freed)
+        if shift:
+            self._set_base((self.base - shift) % self.total_rows)
+        self.top = min(self.top + count, self.height)
+    
+    def _move_rows(self, moves, cleared, freed):
+        """按 (目标槽位, 来源槽位) 移动行引用，把清零后的被消除行放到空出的槽位
+
+        写时复制时，共享的被消除行不清零，改用新的空行；owned 标记随行一起移动。
+        """
+        slots = self.slots
+        owned = self.owned
+        recycled = [slots[slot] if owned is None or owned[slot] else None for slot in cleared]
+        for index, row in enumerate(recycled):
+            if row is None:
+                recycled[index] = list(self.empty_row)
+            else:
+                row[:] = self.empty_row
+        row_keys = self.row_keys
+        for target, source in moves:
+            slots[target] = slots[source]
+            row_keys[target] = row_keys[source]
+        for slot, row in zip(freed, recycled):
+            slots[slot] = row
+            row_keys[slot] = 0
+        if owned is not None:
+            for target, source in moves:
+                owned[target] = owned[source]
+            for slot in freed:
+                owned[slot] = True
+    
+    def _update_skyline(self):
+        """从 top 向下扫描，重新计算每列最高的已占用行"""
+        column_tops = self.column_tops
+        missing = list(range(self.width))
+        for y in range(self.top, self.height):
+            row = self.slots[self.row_slots[y]]
+            remaining = []
+            for x in missing:
+                if row[x]:
+                    column_tops[x] = y
+                else:
+                    remaining.append(x)
+            missing = remaining
+            if not missing:
+                break
+        for x in missing:
+            column_tops[x] = self.height
+        self.landing_cache.clear()
+    
+    def _rows_hash(self, last_row, first_row=None):
+        """计算 first_row（默认为最高的隐藏行）到 last_row 行的 Zobrist 哈希"""
+        if first_row is None:
+            first_row = -self.buffer
+        row_keys = self.row_keys
+        row_slots = self.row_slots
+        value = 0
+        for y in range(first_row, last_row + 1):
+            key = row_keys[row_slots[y]]
+            if key:
+                value ^= rotate_key(key, y)
+        return value
+    
+    def sync(self):
+        """直接修改 grid 中的格子之后，重新计算 top 和哈希"""
+        if self.journal is not None:
+            self._record(range(self.total_rows))
+        self._sync_rows()
+        self.top = self.height
+        for y in range(-self.buffer, self.height):
+            if any(self.slots[self.row_slots[y]]):
+                self.top = y
+                break
+        self.hash = self._rows_hash(self.height - 1)
+        self._update_skyline()
+    
+    def _sync_rows(self):
+        """sync() 中根据 grid 重建派生的行数据（行键）"""
+        column_keys = self.column_keys
+        for slot, row in enumerate(self.slots):
+            key = 0
+            for x, cell in enumerate(row):
+                if cell:
+                    key ^= column_keys[x]
+            self.row_keys[slot] = key
     
     def update_stats(self, lines_cleared):
         """更新分数和等级"""
@@ -85,20 +520,69 @@ class Board:
     
     def add_soft_drop_score(self, distance):
         """添加软降得分"""
+        if self.journal is not None:
+            self._record()
         self.score += distance
     
     def add_hard_drop_score(self, distance):
         """添加硬降得分"""
+        if self.journal is not None:
+            self._record()
         self.score += distance * 2
     
+    def add_garbage(self, count, hole):
+        """从底部加入 count 行只在 hole 列留空的垃圾行，其余行整体上移
+
+        只需把 base 后移 count：原来最顶部的 count 行成为新的底部行，改写为垃圾行。
+        返回是否有方块被推出了缓冲区顶部。
+        """
+        count = min(count, self.total_rows)
+        if not count:
+            return False
+        overflow = self.top < -self.buffer + count
+        if self.journal is not None:
+            # 被改写为垃圾行的是当前最顶部的 count 个槽位
+            rewritten = [self.row_slots[-self.buffer + i] for i in range(count)]
+            self._record(rewritten, rewritten)
+        self._set_base((self.base + count) % self.total_rows)
+        for y in range(self.height - count, self.height):
+            self._fill_garbage_row(self.row_slots[y], hole)
+        self.top = max(min(self.top, self.height) - count, -self.buffer)
+        # 所有行的位置都变了，重新计算有方块部分的哈希
+        self.hash = self._rows_hash(self.height - 1, self.top)
+        self._update_skyline()
+        return overflow
+    
+    def _fill_garbage_row(self, slot, hole):
+        row = self._writable_row(slot)
+        row[:] = self.empty_row
+        for x in range(self.width):
+            if x != hole:
+                row[x] = GARBAGE_COLOR
+        self.row_keys[slot] = self.garbage_key ^ self.column_keys[hole]
+    
     def is_game_over(self, tetromino):
         """检查游戏是否结束"""
         return not self.is_valid_position(tetromino)
     
     def reset(self):
-        """重置游戏板"""
-        self.grid = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+        """重置游戏板，原地清零所有行（写时复制时换成新的空行）"""
+        if self.journal is not None:
+            everything = range(self.total_rows)
+            self._record(everything, everything)
+        if self.owned is None:
+            for row in self.slots:
+                row[:] = self.empty_row
+        else:
+            self.slots[:] = [list(self.empty_row) for _ in range(self.total_rows)]
+            self.owned[:] = [True] * self.total_rows
+        self.row_keys[:] = [0] * self.total_rows
+        self._set_base(0)
+        self.top = self.height
+        self.column_tops[:] = [self.height] * self.width
+        self.landing_cache.clear()
         self.score = 0
         self.level = 1
         self.lines_cleared = 0
-        self.total_lines = 0
\ No newline at end of file
+        self.total_lines = 0
+        self.hash = 0
\ No newline at end of file
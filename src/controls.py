@@ -0,0 +1,91 @@
+"""
+输入管线 - 带时间戳的按键队列和左右移动的自动重复（DAS/ARR）
+
+不依赖 pygame。按下左右键时立即移动一格，按住超过 DAS 秒后每隔 ARR 秒再移动一格；
+同时按住左右键时以后按下的为准。所有重复移动的时刻都按真实时间计算，
+poll(t) 返回 t 之前到期的全部动作，因此 ARR 小于一帧时一个逻辑帧内可以移动多格。
+"""
+
+from collections import deque
+
+try:
+    from board import GRID_WIDTH
+    from engine import ACTION_LEFT, ACTION_RIGHT
+except ImportError:
+    import os
+    import sys
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, current_dir)
+    from board import GRID_WIDTH
+    from engine import ACTION_LEFT, ACTION_RIGHT
+
+# 自动重复的默认参数（秒）
+DAS_DELAY = 0.167       # 按住多久后开始自动重复
+ARR_INTERVAL = 0.033    # 自动重复的间隔，0 表示直接移到墙边
+
+SHIFT_ACTIONS = (ACTION_LEFT, ACTION_RIGHT)
+
+
+class InputPipeline:
+    """按时间顺序排队的输入事件，按需展开为引擎动作
+
+    push(时间, 动作) 加入一次按键，左右键松开时调用 push(时间, 动作, pressed=False)，
+    其余动作（旋转、硬降、软降开始和结束）原样输出。columns 为 ARR 为 0 时一次移动的最大格数。
+    """
+
+    def __init__(self, das=DAS_DELAY, arr=ARR_INTERVAL, columns=GRID_WIDTH):
+        self.das = das
+        self.arr = arr
+        self.columns = columns
+        self.events = deque()
+        self.held = []
+        self.next_repeat = None
+
+    def push(self, time, action, pressed=True):
+        """加入一个按键事件，时间必须单调不减"""
+        if pressed or action in SHIFT_ACTIONS:
+            self.events.append((time, action, pressed))
+
+    def clear(self):
+        """丢弃排队的事件和按住的状态（重新开始游戏时调用）"""
+        self.events.clear()
+        self.held.clear()
+        self.next_repeat = None
+
+    def poll(self, until):
+        """返回 until 之前（含）到期的动作，按时间顺序，包括自动重复的移动"""
+        actions = []
+        events = self.events
+        while True:
+            event_time = events[0][0] if events else None
+            repeat_time = self.next_repeat
+            if repeat_time is not None and repeat_time <= until and \
+                    (event_time is None or repeat_time < event_time):
+                self._repeat(actions, until)
+                continue
+            if event_time is None or event_time > until:
+                return actions
+
+            time, action, pressed = events.popleft()
+            if action not in SHIFT_ACTIONS:
+                actions.append(action)
+            elif pressed:
+                if action in self.held:
+                    self.held.remove(action)
+                self.held.append(action)
+                actions.append(action)
+                self.next_repeat = time + self.das
+            elif action in self.held:
+                # 松开后如果另一个方向仍按住，从现在开始重新计算 DAS
+                self.held.remove(action)
+                self.next_repeat = time + self.das if self.held else None
+
+    def _repeat(self, actions, until):
+        action = self.held[-1]
+        if self.arr > 0:
+            actions.append(action)
+            self.next_repeat += self.arr
+        else:
+            # ARR 为 0：每次轮询都直接移到墙边
+            actions.extend([action] * (self.columns - 1))
+            self.next_repeat = until + 1e-9
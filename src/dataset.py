@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+训练数据集 - 定长二进制记录的 (游戏板, 当前方块, 下一个方块, 动作, 奖励) 样本
+
+文件格式（所有整数为小端序）：
+    文件头 16 字节：b'TDSB' | 版本 (1 字节) | 保留 (1 字节) | 宽 (2 字节) | 高 (2 字节)
+                    | 记录长度 (2 字节) | 保留 (4 字节)
+    之后是首尾相接的定长记录，记录数由文件大小算出：
+        占用掩码  ceil(宽×高 / 8) 字节，第 y 行第 x 列为第 y×宽+x 位
+        颜色编号  ceil(宽×高 / 2) 字节，每格 4 位，偶数格在低 4 位（见 COLOR_TABLE）
+        当前方块 (1 字节) | 下一个方块 (1 字节) | 动作 (2 字节) | 奖励 (float32)
+        补零到 8 字节的整数倍
+
+只记录可见的 grid，不含出生缓冲区。Dataset 用 mmap 打开文件，随机读取单条样本
+不会把整个文件读入内存；安装了 numpy 时 Dataset.numpy() 返回同一文件上的 numpy.memmap。
+动作编号的含义由写入方决定，record 命令写入的是 placement_action() 编码的落点。
+"""
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+try:
+    from board import GRID_WIDTH, GRID_HEIGHT, GARBAGE_COLOR
+    from tetromino import COLORS
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, current_dir)
+    from board import GRID_WIDTH, GRID_HEIGHT, GARBAGE_COLOR
+    from tetromino import COLORS
+
+MAGIC = b'TDSB'
+VERSION = 1
+HEADER = struct.Struct('<4sBxHHH4x')
+TAIL = struct.Struct('<BBHf')
+RECORD_ALIGN = 8
+
+# 颜色编号：0 为空格，1-7 为方块类型加一，8 为垃圾行
+COLOR_TABLE = (0,) + tuple(COLORS) + (GARBAGE_COLOR,)
+COLOR_INDEX = {color: index for index, color in enumerate(COLOR_TABLE)}
+
+# 没有可用落点时记录的动作
+NO_PLACEMENT = 0xFFFF
+
+Sample = namedtuple('Sample', 'rows piece next_piece action reward')
+
+
+class DatasetError(Exception):
+    """数据集文件损坏、格式不支持或与游戏板尺寸不符"""
+
+
+def placement_action(rotation, x):
+    """把落点编码为动作编号：x 占高位，旋转状态占低 2 位"""
+    return (x << 2) | rotation
+
+
+def record_layout(width, height):
+    """返回 (掩码字节数, 颜色字节数, 记录长度)"""
+    cells = width * height
+    mask_bytes = (cells + 7) // 8
+    color_bytes = (cells + 1) // 2
+    size = mask_bytes + color_bytes + TAIL.size
+    return mask_bytes, color_bytes, -(-size // RECORD_ALIGN) * RECORD_ALIGN
+
+
+def _read_header(data):
+    if len(data) < HEADER.size:
+        raise DatasetError("数据集文件不完整")
+    magic, version, width, height, record_size = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise DatasetError("不是数据集文件")
+    if version != VERSION:
+        raise DatasetError(f"不支持的数据集版本: {version}")
+    if record_size != record_layout(width, height)[2]:
+        raise DatasetError("记录长度与游戏板尺寸不符")
+    return width, height, record_size
+
+
+class DatasetWriter:
+    """向数据集文件追加样本，文件已存在时检查尺寸后接着写"""
+
+    def __init__(self, path, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.width = width
+        self.height = height
+        self.mask_bytes, self.color_bytes, self.record_size = record_layout(width, height)
+        self.padding = bytes(self.record_size - self.mask_bytes - self.color_bytes - TAIL.size)
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as f:
+                existing = _read_header(f.read(HEADER.size))
+            if existing[:2] != (width, height):
+                raise DatasetError(f"数据集是 {existing[0]}x{existing[1]} 的游戏板")
+            self.file = open(path, 'ab')
+            # 截掉上次中断时写了一半的记录
+            extra = (self.file.tell() - HEADER.size) % self.record_size
+            if extra:
+                self.file.truncate(self.file.tell() - extra)
+                self.file.seek(0, os.SEEK_END)
+        else:
+            self.file = open(path, 'wb')
+            self.file.write(HEADER.pack(MAGIC, VERSION, width, height, self.record_size))
+        self.count = 0
+
+    def append(self, grid, piece, next_piece, action, reward):
+        """写入一条样本，grid 为 Board.grid 或同样格式的行列表，piece 和 next_piece 为方块类型编号"""
+        if len(grid) != self.height or any(len(row) != self.width for row in grid):
+            raise DatasetError(f"游戏板尺寸与数据集（{self.width}x{self.height}）不符")
+        try:
+            cells = [COLOR_INDEX[cell] for row in grid for cell in row]
+        except KeyError as e:
+            raise DatasetError(f"无法编码的格子颜色: {e.args[0]}") from None
+        if len(cells) & 1:
+            cells.append(0)
+
+        mask = 0
+        for index, cell in enumerate(cells):
+            if cell:
+                mask |= 1 << index
+        write = self.file.write
+        write(mask.to_bytes(self.mask_bytes, 'little'))
+        write(bytes([low | high << 4 for low, high in zip(cells[0::2], cells[1::2])]))
+        write(TAIL.pack(piece, next_piece, action, reward))
+        write(self.padding)
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Dataset:
+    """用 mmap 只读打开的数据集，按下标随机读取
+
+    dataset[i] 返回 Sample，其中 rows 为行掩码元组（与 BitBoard.rows、ai.board_rows 相同）；
+    colors(i) 和 grid(i) 还原每格的颜色。record(i) 返回不复制的 memoryview，
+    需要在 close() 之前释放。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            size = os.fstat(self.file.fileno()).st_size
+            self.width, self.height, self.record_size = _read_header(self.file.read(HEADER.size))
+            self.mask_bytes, self.color_bytes, _ = record_layout(self.width, self.height)
+            self.count = (size - HEADER.size) // self.record_size
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.file.close()
+            raise
+        self.full_row = (1 << self.width) - 1
+
+    def __len__(self):
+        return self.count
+
+    def _offset(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("样本下标超出范围")
+        return HEADER.size + index * self.record_size
+
+    def record(self, index):
+        """第 index 条记录的原始字节（不复制）"""
+        offset = self._offset(index)
+        return memoryview(self.buffer)[offset:offset + self.record_size]
+
+    def __getitem__(self, index):
+        offset = self._offset(index)
+        buffer = self.buffer
+        mask = int.from_bytes(buffer[offset:offset + self.mask_bytes], 'little')
+        width = self.width
+        full_row = self.full_row
+        rows = tuple((mask >> (y * width)) & full_row for y in range(self.height))
+        piece, next_piece, action, reward = TAIL.unpack_from(
+            buffer, offset + self.mask_bytes + self.color_bytes)
+        return Sample(rows, piece, next_piece, action, reward)
+
+    def colors(self, index):
+        """每格的颜色编号，按行返回"""
+        offset = self._offset(index) + self.mask_bytes
+        packed = self.buffer[offset:offset + self.color_bytes]
+        cells = []
+        for byte in packed:
+            cells.append(byte & 0x0F)
+            cells.append(byte >> 4)
+        width = self.width
+        return [cells[y * width:(y + 1) * width] for y in range(self.height)]
+
+    def grid(self, index):
+        """还原为 Board.grid 的格式（空格为 0，其余为颜色元组）"""
+        return [[COLOR_TABLE[cell] for cell in row] for row in self.colors(index)]
+
+    def batches(self, batch_size, seed=None):
+        """按打乱后的顺序逐批返回样本列表，每个样本恰好出现一次"""
+        order = array('q', range(self.count))
+        random.Random(seed).shuffle(order)
+        for start in range(0, self.count, batch_size):
+            yield [self[index] for index in order[start:start + batch_size]]
+
+    def numpy(self):
+        """同一文件上的只读 numpy.memmap，字段为 mask、colors、piece、next_piece、action、reward
+
+        需要安装 numpy。
+        """
+        import numpy as np  # 可选依赖，只在需要时导入
+        mask_bytes, color_bytes = self.mask_bytes, self.color_bytes
+        dtype = np.dtype({
+            'names': ['mask', 'colors', 'piece', 'next_piece', 'action', 'reward'],
+            'formats': [(np.uint8, mask_bytes), (np.uint8, color_bytes),
+                        np.uint8, np.uint8, '<u2', '<f4'],
+            'offsets': [0, mask_bytes] + [mask_bytes + color_bytes + offset for offset in (0, 1, 2, 4)],
+            'itemsize': self.record_size,
+        })
+        return np.memmap(self.path, dtype=dtype, mode='r', offset=HEADER.size, shape=(self.count,))
+
+    def close(self):
+        self.buffer.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record_games(path, policy_name='greedy', games=1, first_seed=0, max_pieces=1000):
+    """用 AI 策略对局，把每个方块落下前的游戏板、选择的落点和得分变化写入数据集，返回写入的样本数"""
+    from ai import apply_placement
+    from engine import GameEngine
+    from tournament import POLICIES, build_bot
+
+    policy = POLICIES[policy_name]
+    with DatasetWriter(path) as writer:
+        for seed in range(first_seed, first_seed + games):
+            engine = GameEngine(seed=seed, preview_depth=max(1, policy.get('depth', 2) - 1))
+            bot = build_bot(policy)
+            board = engine.board
+            for _ in range(max_pieces):
+                if engine.game_over:
+                    break
+                piece = engine.current_piece.shape_index
+                next_piece = engine.next_piece.shape_index
+                score = board.score
+                placement = bot.choose(engine)
+                if placement is None:
+                    action = NO_PLACEMENT
+                else:
+                    action = placement_action(placement.rotation, placement.x)
+                # 样本是落下之前的游戏板，奖励要等落子之后才知道
+                grid = [row[:] for row in board.grid]
+                if placement is None:
+                    engine.hard_drop()
+                else:
+                    apply_placement(engine, placement)
+                writer.append(grid, piece, next_piece, action, board.score - score)
+        return writer.count
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="俄罗斯方块训练数据集")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record = subparsers.add_parser('record', help="用 AI 对局生成样本（追加到已有文件）")
+    record.add_argument('path')
+    record.add_argument('--policy', default='greedy', help="tournament.py 中的内置策略")
+    record.add_argument('--games', type=int, default=1)
+    record.add_argument('--first-seed', type=int, default=0)
+    record.add_argument('--max-pieces', type=int, default=1000)
+    info = subparsers.add_parser('info', help="显示样本数和记录大小")
+    info.add_argument('path')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        if args.command == 'record':
+            count = record_games(args.path, args.policy, args.games, args.first_seed, args.max_pieces)
+            print(f"写入 {count} 条样本")
+        else:
+            with Dataset(args.path) as dataset:
+                print(f"{dataset.width}x{dataset.height}  {len(dataset)} 条样本  "
+                      f"每条 {dataset.record_size} 字节")
+    except DatasetError as e:
+        print(f"{args.path}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+无界面游戏引擎 - 不依赖 pygame，可用于模拟、平衡性测试和回归测试
+"""
+
+import random
+
+try:
+    from tetromino import TetrominoPool
+    from board import Board
+    from piece_queue import PieceGenerator, PieceQueue
+    from telemetry import EVENT_START, EVENT_SPAWN, EVENT_LOCK, EVENT_CLEAR, EVENT_LEVEL, EVENT_GAME_OVER
+except ImportError:
+    import os
+    import sys
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, current_dir)
+    from tetromino import TetrominoPool
+    from board import Board
+    from piece_queue import PieceGenerator, PieceQueue
+    from telemetry import EVENT_START, EVENT_SPAWN, EVENT_LOCK, EVENT_CLEAR, EVENT_LEVEL, EVENT_GAME_OVER
+
+# 游戏设置
+INITIAL_FALL_SPEED = 0.5
+SPEED_INCREASE_PER_LEVEL = 0.05
+FAST_DROP_MULTIPLIER = 10
+
+# 模拟帧率（每秒帧数）
+FRAME_RATE = 60
+FRAME_TIME = 1.0 / FRAME_RATE
+
+# 对战：按一次消除的行数索引，送给对手的垃圾行数
+GARBAGE_ATTACK = (0, 0, 1, 2, 4)
+
+# 动作定义
+ACTION_NONE = 0
+ACTION_LEFT = 1
+ACTION_RIGHT = 2
+ACTION_ROTATE = 3
+ACTION_HARD_DROP = 4
+ACTION_SOFT_DROP_START = 5
+ACTION_SOFT_DROP_STOP = 6
+
+
+class GameEngine:
+    """游戏规则：重力、移动、旋转、锁定和生成新方块"""
+
+    def __init__(self, board_class=Board, seed=None, preview_depth=1):
+        """board_class 可以是任何返回游戏板的可调用对象，
+        例如 functools.partial(Board, width=40, height=100) 用于自定义尺寸"""
+        self.board = board_class()
+        self.preview_depth = preview_depth
+        # 锁定的方块归还对象池，生成新方块时复用，不再每次新建
+        self.piece_pool = TetrominoPool()
+        self.current_piece = None
+        self.next_piece = None
+        self._init_pieces(seed)
+        self.fall_time = 0
+        self.fast_drop = False
+        self.game_over = False
+        self.paused = False
+        self.frame = 0
+        self.recorder = None
+        self.telemetry = None
+        self._init_garbage()
+
+    def _init_pieces(self, seed):
+        """用给定种子重新开始方块序列"""
+        self.pieces = PieceQueue(PieceGenerator(seed), self.preview_depth)
+        self.seed = self.pieces.generator.seed
+        pool = self.piece_pool
+        for piece in (self.current_piece, self.next_piece):
+            if piece is not None:
+                pool.release(piece)
+        self.current_piece = pool.acquire(shape=self.pieces.pop(), board=self.board)
+        self.next_piece = pool.acquire(shape=self.pieces.peek(), board=self.board)
+
+    def _init_garbage(self):
+        """对战状态：待上涨的垃圾行和待发送的攻击行数"""
+        self.pending_garbage = 0
+        self.outgoing_garbage = 0
+        self.garbage_rng = random.Random(self.seed)
+
+    def receive_garbage(self, lines):
+        """收到对手的攻击，垃圾行在下一次不消行的锁定后上涨"""
+        self.pending_garbage += lines
+        if self.recorder is not None:
+            self.recorder.record_garbage(self.frame, lines)
+
+    def spawn_piece(self):
+        """下一个方块成为当前方块，并从队列补充预览；锁定的旧方块归还对象池"""
+        self.piece_pool.release(self.current_piece)
+        self.current_piece = self.next_piece
+        self.pieces.pop()
+        self.next_piece = self.piece_pool.acquire(shape=self.pieces.peek(), board=self.board)
+        if self.telemetry is not None:
+            self._emit_spawn()
+
+    def toggle_pause(self):
+        """切换暂停状态"""
+        self.paused = not self.paused
+
+    def get_fall_speed(self):
+        """获取当前下落速度"""
+        base_speed = max(0.05, INITIAL_FALL_SPEED - (self.board.level - 1) * SPEED_INCREASE_PER_LEVEL)
+        return base_speed / FAST_DROP_MULTIPLIER if self.fast_drop else base_speed
+
+    def start_recording(self):
+        """开始把本局的动作记录为录像"""
+        from replay import ReplayRecorder  # replay 依赖本模块，延迟导入
+        board = self.board
+        self.recorder = ReplayRecorder(self.seed, board.width, board.height, board.buffer)
+
+    def finish_recording(self):
+        """结束录像并返回录像数据，没有在录像时返回 None"""
+        if self.recorder is None:
+            return None
+        return self.recorder.finish(self.frame, self.board.score)
+
+    def start_telemetry(self, writer, **tags):
+        """开始向 writer（telemetry.TelemetryWriter）发送本局的事件，重新开始时自动换新的对局编号
+
+        tags 原样写入每局的 start 事件，例如 AI 策略名。
+        """
+        self.telemetry = writer
+        self.telemetry_tags = tags
+        self._start_session()
+
+    def _start_session(self):
+        self.session = self.telemetry.new_session()
+        board = self.board
+        self._emit(EVENT_START, seed=self.seed, width=board.width, height=board.height,
+                   **self.telemetry_tags)
+        self._emit_spawn()
+
+    def _emit(self, event, **fields):
+        """发送一个事件，字段在后台线程中才序列化"""
+        fields['event'] = event
+        fields['session'] = self.session
+        fields['frame'] = self.frame
+        self.telemetry.emit(fields)
+
+    def _emit_spawn(self):
+        # 记录生成时的分数，锁定事件的 score_delta 包括软降、硬降和消行得分
+        piece = self.current_piece
+        self.spawn_score = self.board.score
+        self._emit(EVENT_SPAWN, piece=piece.shape_index, x=piece.x, y=piece.y)
+
+    def _emit_lock(self, piece, lines_cleared, level):
+        board = self.board
+        self._emit(EVENT_LOCK, piece=piece.shape_index, x=piece.x, y=piece.y, rotation=piece.rotation,
+                   drop=piece.y - board.spawn_y, lines=lines_cleared,
+                   score_delta=board.score - self.spawn_score)
+        if lines_cleared:
+            self._emit(EVENT_CLEAR, lines=lines_cleared, total_lines=board.total_lines, score=board.score)
+        if board.level != level:
+            self._emit(EVENT_LEVEL, level=board.level)
+
+    def apply_action(self, action):
+        """执行一个动作"""
+        if action == ACTION_SOFT_DROP_STOP:
+            self.fast_drop = False
+            if self.recorder is not None:
+                self.recorder.record(self.frame, action)
+            return
+
+        if self.game_over or self.paused:
+            return
+
+        if self.recorder is not None and action != ACTION_NONE:
+            self.recorder.record(self.frame, action)
+
+        if action == ACTION_LEFT:
+            self.move_piece(-1)
+        elif action == ACTION_RIGHT:
+            self.move_piece(1)
+        elif action == ACTION_ROTATE:
+            self.rotate_piece()
+        elif action == ACTION_HARD_DROP:
+            self.hard_drop()
+        elif action == ACTION_SOFT_DROP_START:
+            self.fast_drop = True
+
+    def move_piece(self, dx):
+        """左右移动当前方块"""
+        if self.board.is_valid_position(self.current_piece, x_offset=dx):
+            self.current_piece.x += dx
+            return True
+        return False
+
+    def rotate_piece(self):
+        """旋转当前方块，依次尝试踢墙偏移"""
+        piece = self.current_piece
+        rotation = piece.rotation
+        kicks = piece.get_wall_kicks()
+        piece.set_rotation((rotation + 1) % 4)
+
+        for dx, dy in kicks:
+            if self.board.is_valid_position(piece, x_offset=dx, y_offset=dy):
+                piece.x += dx
+                piece.y += dy
+                return True
+
+        # 所有偏移都无效，恢复原状
+        piece.set_rotation(rotation)
+        return False
+
+    def hard_drop(self):
+        """硬降 - 直接落到底部，落点行由游戏板的列高度缓存给出"""
+        distance = self.board.landing_row(self.current_piece) - self.current_piece.y
+
+        if distance > 0:
+            self.current_piece.y += distance
+            self.board.add_hard_drop_score(distance)
+            self.lock_piece()
+
+    def lock_piece(self):
+        """锁定当前方块并生成新方块
+
+        消行产生的攻击先抵消待上涨的垃圾行，剩余部分累加到 outgoing_garbage；
+        本次没有消行时，待上涨的垃圾行全部加入游戏板底部。
+        """
+        level = self.board.level
+        lines_cleared = self.board.place_tetromino(self.current_piece)
+        if self.telemetry is not None:
+            self._emit_lock(self.current_piece, lines_cleared, level)
+        attack = GARBAGE_ATTACK[min(lines_cleared, len(GARBAGE_ATTACK) - 1)]
+        overflow = False
+        if self.pending_garbage:
+            cancelled = min(attack, self.pending_garbage)
+            self.pending_garbage -= cancelled
+            attack -= cancelled
+            if not lines_cleared and self.pending_garbage:
+                hole = self.garbage_rng.randrange(self.board.width)
+                overflow = self.board.add_garbage(self.pending_garbage, hole)
+                self.pending_garbage = 0
+        self.outgoing_garbage += attack
+        self.spawn_piece()
+
+        # 检查游戏是否结束，垃圾行把方块推出顶部也算结束
+        if overflow or self.board.is_game_over(self.current_piece):
+            self.game_over = True
+            if self.telemetry is not None:
+                board = self.board
+                self._emit(EVENT_GAME_OVER, score=board.score, total_lines=board.total_lines,
+                           level=board.level)
+
+    def update(self, delta_time):
+        """更新游戏状态"""
+        if self.game_over or self.paused:
+            return
+
+        self.fall_time += delta_time
+        fall_speed = self.get_fall_speed()
+
+        # 保留余下的时间，下落速度快于帧率时一帧内可以下落多行
+        while self.fall_time >= fall_speed and not self.game_over:
+            self.fall_time -= fall_speed
+            if self.board.is_valid_position(self.current_piece, y_offset=1):
+                self.current_piece.y += 1
+                if self.fast_drop:
+                    self.board.add_soft_drop_score(1)
+            else:
+                self.lock_piece()
+            fall_speed = self.get_fall_speed()
+
+    def step(self, action=ACTION_NONE):
+        """执行一个动作并推进一帧，frame 只统计实际执行的逻辑帧"""
+        self.apply_action(action)
+        if self.game_over or self.paused:
+            return
+        self.update(FRAME_TIME)
+        self.frame += 1
+
+    def run(self, actions, max_frames=None):
+        """按帧消费动作流，直到动作用完、游戏结束或达到帧数上限
+
+        actions 中每一项对应一帧，可以是单个动作或动作列表。
+        """
+        for actions_in_frame in actions:
+            if self.game_over or (max_frames is not None and self.frame >= max_frames):
+                break
+            if isinstance(actions_in_frame, int):
+                self.step(actions_in_frame)
+            else:
+                for action in actions_in_frame:
+                    self.apply_action(action)
+                self.step()
+        return self.board.score
+
+    def reset_game(self, seed=None):
+        """重置游戏，seed 为 None 时使用新的随机种子"""
+        self.board.reset()
+        self._init_pieces(seed)
+        self.fall_time = 0
+        self.fast_drop = False
+        self.game_over = False
+        self.paused = False
+        self.frame = 0
+        self._init_garbage()
+        if self.recorder is not None:
+            self.start_recording()
+        if self.telemetry is not None:
+            self._start_session()
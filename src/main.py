@@ -3,39 +3,95 @@
 俄罗斯方块游戏 - 主入口文件
 """
 
+import time
+
+# 启动计时的起点，计入导入 pygame 等模块的耗时
+STARTED_AT = time.perf_counter()
+
+import argparse
+import functools
 import os
 import sys
 
 # 添加 src 目录到 Python 路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from game import TetrisGame, BOARD_BACKENDS, RENDER_FPS, RENDER_FPS_POWER_SAVE
+from board import GRID_WIDTH, GRID_HEIGHT, SPAWN_BUFFER
+from controls import DAS_DELAY, ARR_INTERVAL
 
-from game import TetrisGame
+def parse_args():
+    parser = argparse.ArgumentParser(description="俄罗斯方块游戏")
+    parser.add_argument('--board', choices=sorted(BOARD_BACKENDS), default='list',
+                        help="游戏板实现")
+    parser.add_argument('--width', type=int, default=GRID_WIDTH,
+                        help="游戏板列数")
+    parser.add_argument('--height', type=int, default=GRID_HEIGHT,
+                        help="游戏板可见行数")
+    parser.add_argument('--buffer', type=int, default=SPAWN_BUFFER,
+                        help="第 0 行上方隐藏的出生缓冲行数")
+    parser.add_argument('--fps', type=int, default=RENDER_FPS,
+                        help="渲染帧率上限，0 表示不限制")
+    parser.add_argument('--power-save', action='store_true',
+                        help=f"省电模式，渲染帧率限制为 {RENDER_FPS_POWER_SAVE}")
+    parser.add_argument('--vsync', action='store_true',
+                        help="开启垂直同步")
+    parser.add_argument('--interpolate', action='store_true',
+                        help="平滑显示方块下落")
+    parser.add_argument('--das', type=float, default=DAS_DELAY * 1000, metavar='MS',
+                        help="按住左右键多少毫秒后开始自动移动")
+    parser.add_argument('--arr', type=float, default=ARR_INTERVAL * 1000, metavar='MS',
+                        help="自动移动的间隔（毫秒），0 表示直接移到墙边")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="方块序列的随机种子，用于复现对局")
+    parser.add_argument('--record', metavar='DIR', default=None,
+                        help="把每局录像保存到该目录")
+    parser.add_argument('--telemetry', metavar='DIR', default=None,
+                        help="把每个方块的事件写入该目录（见 telemetry.py）")
+    parser.add_argument('--no-music', action='store_true',
+                        help="不加载背景音乐")
+    parser.add_argument('--profile', action='store_true',
+                        help="启动时显示帧时间统计（也可按 F3 切换）")
+    parser.add_argument('--trace', metavar='FILE', default=None,
+                        help="退出时把最近的帧时间写成 Chrome 追踪文件")
+    parser.add_argument('--connect', metavar='HOST:PORT', default=None,
+                        help="连接对战服务器（见 versus.py）进行多人对战")
+    parser.add_argument('--players', type=int, default=2,
+                        help="对战人数")
+    return parser.parse_args()
 
 def main():
-    print("🎮 俄罗斯方块游戏 - 专业版")
-    print("=" * 40)
-    print("游戏特色:")
-    print("• 完整的得分统计系统")
-    print("• 等级系统（消除行数越多速度越快）")
-    print("• 下一个方块预览")
-    print("• 背景音乐")
-    print("• 中文字体支持")
-    print("• 专业的游戏界面")
-    print("=" * 40)
-    print("游戏控制:")
-    print("← → : 左右移动方块")
-    print("↑ : 旋转方块")
-    print("↓ : 快速下落（按住）")
-    print("空格 : 硬降落（直接落到底部）")
-    print("P : 暂停游戏")
-    print("M : 开启/关闭音效")
-    print("R : 重新开始游戏")
-    print("ESC : 退出游戏")
-    print("=" * 40)
+    args = parse_args()
+    
+    print("← → 移动  ↑ 旋转  ↓ 快速下落  空格 硬降  P 暂停  M 音乐  F3 帧时间  R 重新开始  ESC 退出")
+    
+    versus = None
+    if args.connect is not None:
+        # 只有联网对战才导入 versus（及其依赖的 asyncio）
+        from versus import VersusLink, DEFAULT_HOST
+        host, _, port = args.connect.rpartition(':')
+        versus = VersusLink(host or DEFAULT_HOST, int(port), args.players)
     
     try:
-        game = TetrisGame()
+        game = TetrisGame(
+            board_class=functools.partial(BOARD_BACKENDS[args.board], width=args.width,
+                                          height=args.height, buffer=args.buffer),
+            render_fps=RENDER_FPS_POWER_SAVE if args.power_save else args.fps,
+            vsync=args.vsync,
+            interpolate=args.interpolate,
+            seed=args.seed,
+            replay_dir=args.record,
+            telemetry_dir=args.telemetry,
+            trace_path=args.trace,
+            versus=versus,
+            music=not args.no_music,
+            started_at=STARTED_AT,
+            das=args.das / 1000,
+            arr=args.arr / 1000,
+        )
+        game.profiler.visible = args.profile
         game.run()
     except Exception as e:
         print(f"游戏运行出错: {e}")
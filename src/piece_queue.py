@@ -0,0 +1,99 @@
+"""
+方块序列 - 可复现的随机种子、7-bag 随机器和预览队列
+"""
+
+import random
+
+try:
+    from tetromino import SHAPES
+except ImportError:
+    import os
+    import sys
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, current_dir)
+    from tetromino import SHAPES
+
+# 每次批量生成的 bag 数量
+BAGS_PER_REFILL = 64
+
+
+def new_seed():
+    """生成一个新的随机种子"""
+    return random.SystemRandom().randrange(2 ** 63)
+
+
+class PieceGenerator:
+    """使用独立随机数生成器的方块类型序列
+
+    use_bag 为 True 时使用 7-bag：每 7 个方块恰好包含每种方块各一个；
+    否则每个方块独立均匀随机。序列只与种子有关。
+    """
+
+    def __init__(self, seed=None, use_bag=True):
+        self.seed = new_seed() if seed is None else seed
+        self.use_bag = use_bag
+        self.rng = random.Random(self.seed)
+        self.buffer = bytearray()
+        self.position = 0
+
+    def _refill(self):
+        """批量生成下一段序列"""
+        if self.use_bag:
+            pieces = bytearray()
+            bag = list(range(len(SHAPES)))
+            for _ in range(BAGS_PER_REFILL):
+                self.rng.shuffle(bag)
+                pieces.extend(bag)
+        else:
+            count = len(SHAPES) * BAGS_PER_REFILL
+            pieces = bytearray(self.rng.randrange(len(SHAPES)) for _ in range(count))
+        self.buffer = pieces
+        self.position = 0
+
+    def next(self):
+        """取下一个方块类型"""
+        if self.position >= len(self.buffer):
+            self._refill()
+        shape_index = self.buffer[self.position]
+        self.position += 1
+        return shape_index
+
+    def generate(self, count):
+        """批量取出 count 个方块类型，返回 bytearray，不创建 Tetromino 对象"""
+        pieces = bytearray()
+        while len(pieces) < count:
+            if self.position >= len(self.buffer):
+                self._refill()
+            end = min(len(self.buffer), self.position + count - len(pieces))
+            pieces += self.buffer[self.position:end]
+            self.position = end
+        return pieces
+
+
+class PieceQueue:
+    """固定深度的环形预览队列"""
+
+    def __init__(self, generator, depth=1):
+        if depth < 1:
+            raise ValueError("预览队列深度至少为 1")
+        self.generator = generator
+        self.depth = depth
+        self.buffer = generator.generate(depth)
+        self.head = 0
+
+    def pop(self):
+        """取出队首方块，并在队尾补充一个新方块"""
+        shape_index = self.buffer[self.head]
+        self.buffer[self.head] = self.generator.next()
+        self.head = (self.head + 1) % self.depth
+        return shape_index
+
+    def peek(self, index=0):
+        """查看队列中第 index 个方块（0 为下一个）"""
+        if not 0 <= index < self.depth:
+            raise IndexError("超出预览队列深度")
+        return self.buffer[(self.head + index) % self.depth]
+
+    def preview(self):
+        """按顺序返回整个预览队列"""
+        return [self.peek(i) for i in range(self.depth)]
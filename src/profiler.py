@@ -0,0 +1,131 @@
+"""
+帧时间分析器 - 记录主循环每个阶段的耗时，统计分位数并导出 Chrome 追踪文件
+
+不依赖 pygame。时间来自 time.perf_counter_ns，所有数据存放在固定大小的环形缓冲区中，
+长时间运行也不会增长内存。
+"""
+
+import json
+import time
+from array import array
+
+# 主循环的阶段，按执行顺序排列
+PHASE_INPUT = 0
+PHASE_UPDATE = 1
+PHASE_DRAW = 2
+PHASE_FLIP = 3
+PHASE_SLEEP = 4
+PHASE_NAMES = ('handle_input', 'update', 'draw', 'display.flip', 'clock.tick')
+
+# 环形缓冲区默认保存的帧数
+DEFAULT_CAPACITY = 600
+
+# 一帧耗时超过预算的该倍数时计为掉帧
+DROP_FACTOR = 1.5
+
+
+def _percentile(sorted_values, fraction):
+    """已排序数据的分位数（最近秩法）"""
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    """按阶段记录帧耗时的环形缓冲区
+
+    每帧调用 begin_frame()，每个阶段结束时调用 mark(阶段)，最后调用 end_frame()。
+    frame_budget 为每帧的预算（秒），为 None 时不统计掉帧。
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, frame_budget=None, clock=time.perf_counter_ns):
+        self.capacity = capacity
+        self.clock = clock
+        self.frame_budget_ns = int(frame_budget * 1e9) if frame_budget else 0
+        self.starts = array('q', bytes(8 * capacity))
+        self.totals = array('q', bytes(8 * capacity))
+        self.phases = [array('q', bytes(8 * capacity)) for _ in PHASE_NAMES]
+        self.count = 0
+        self.dropped = 0
+        self.visible = False
+        self._frame_start = 0
+        self._last = 0
+        self._current = [0] * len(PHASE_NAMES)
+
+    def toggle(self):
+        """切换屏幕叠加层"""
+        self.visible = not self.visible
+
+    def begin_frame(self):
+        """开始一帧"""
+        self._frame_start = self._last = self.clock()
+        current = self._current
+        for phase in range(len(current)):
+            current[phase] = 0
+
+    def mark(self, phase):
+        """记录从上一次标记到现在属于 phase 阶段"""
+        now = self.clock()
+        self._current[phase] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        """结束一帧，写入环形缓冲区"""
+        total = self.clock() - self._frame_start
+        index = self.count % self.capacity
+        self.starts[index] = self._frame_start
+        self.totals[index] = total
+        for phase, duration in enumerate(self._current):
+            self.phases[phase][index] = duration
+        self.count += 1
+        if self.frame_budget_ns and total > self.frame_budget_ns * DROP_FACTOR:
+            self.dropped += 1
+
+    def _window(self):
+        """环形缓冲区中有效帧的下标，按时间顺序"""
+        size = min(self.count, self.capacity)
+        first = self.count - size
+        return [(first + i) % self.capacity for i in range(size)]
+
+    def get_stats(self):
+        """返回缓冲区内各帧的统计：分位数（毫秒）、掉帧数和各阶段耗时占比"""
+        window = self._window()
+        totals = sorted(self.totals[i] for i in window)
+        frame_sum = sum(totals)
+        budget = self.frame_budget_ns * DROP_FACTOR
+        return {
+            'frames': len(totals),
+            'p50_ms': _percentile(totals, 0.50) / 1e6,
+            'p99_ms': _percentile(totals, 0.99) / 1e6,
+            'max_ms': (totals[-1] if totals else 0) / 1e6,
+            'dropped': sum(1 for total in totals if total > budget) if budget else 0,
+            'dropped_total': self.dropped,
+            'shares': {
+                name: (sum(self.phases[phase][i] for i in window) / frame_sum if frame_sum else 0.0)
+                for phase, name in enumerate(PHASE_NAMES)
+            },
+        }
+
+    def trace_events(self):
+        """把缓冲区内的帧转换为 Chrome 追踪事件（时间单位为微秒）"""
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': 1, 'tid': 1,
+                   'args': {'name': 'tetris'}}]
+        for index in self._window():
+            start = self.starts[index]
+            events.append({'name': 'frame', 'ph': 'X', 'pid': 1, 'tid': 1,
+                           'ts': start / 1e3, 'dur': self.totals[index] / 1e3})
+            # 各阶段依次执行，起点由前面阶段的耗时累加得到
+            offset = start
+            for phase, name in enumerate(PHASE_NAMES):
+                duration = self.phases[phase][index]
+                if duration:
+                    events.append({'name': name, 'ph': 'X', 'pid': 1, 'tid': 1,
+                                   'ts': offset / 1e3, 'dur': duration / 1e3})
+                offset += duration
+        return events
+
+    def dump_trace(self, path):
+        """写出可以用 chrome://tracing 或 Perfetto 打开的追踪文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, f)
@@ -0,0 +1,477 @@
+"""
+增量渲染器 - 缓存静态背景，只重绘发生变化的区域
+"""
+
+import time
+
+import pygame
+
+try:
+    from text_cache import TextCache
+    from sprites import BlockAtlas, GRID_LINE_GRAY, STATE_GHOST
+    from engine import FRAME_TIME
+except ImportError:
+    import os
+    import sys
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, current_dir)
+    from text_cache import TextCache
+    from sprites import BlockAtlas, GRID_LINE_GRAY, STATE_GHOST
+    from engine import FRAME_TIME
+
+# 直接定义所有常量（标准 10x20 游戏板的布局）
+SCREEN_WIDTH = 320  # 保持宽度
+SCREEN_HEIGHT = 700  # 保持高度
+BLOCK_SIZE = 28     # 合适的方块尺寸
+
+# 颜色定义 - 专业美观的配色
+PURE_WHITE = (255, 255, 255)
+LIGHT_GRAY = (248, 248, 248)
+DARK_GRAY = (120, 120, 120)
+BLACK = (50, 50, 50)  # 深灰色
+ACCENT_BLUE = (80, 140, 240)  # 专业蓝色
+ACCENT_RED = (230, 90, 90)    # 专业红色
+ACCENT_GREEN = (70, 180, 70)  # 专业绿色
+
+# 布局：游戏区域水平居中，位于信息区域下方
+GAME_AREA_Y = 120
+GAME_AREA_MARGIN = 20
+PREVIEW_RECT = pygame.Rect(20, 20, 120, 80)
+STATS_RECT = pygame.Rect(160, 20, 140, 80)
+
+# 游戏区域的最大像素尺寸，大游戏板按比例缩小方块
+MAX_GAME_AREA_WIDTH = 1200
+MAX_GAME_AREA_HEIGHT = 560
+MIN_BLOCK_SIZE = 4
+
+# 帧时间面板：固定大小，覆盖在游戏区域左上角，每 PROFILE_REFRESH 秒刷新
+PROFILE_SIZE = (272, 118)
+PROFILE_PADDING = 6
+PROFILE_REFRESH = 0.5
+PROFILE_LABELS = {
+    'handle_input': "输入",
+    'update': "逻辑",
+    'draw': "绘制",
+    'display.flip': "提交",
+    'clock.tick': "等待",
+}
+
+
+class Layout:
+    """根据游戏板尺寸计算的屏幕布局
+
+    标准 10x20 游戏板得到 320x700 的窗口和 28 像素的方块；
+    更大的游戏板缩小方块，窗口宽度随游戏区域增加。
+    """
+
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = rows
+        self.block_size = max(MIN_BLOCK_SIZE, min(BLOCK_SIZE,
+                                                  MAX_GAME_AREA_WIDTH // columns,
+                                                  MAX_GAME_AREA_HEIGHT // rows))
+        width = columns * self.block_size
+        height = rows * self.block_size
+        self.screen_width = max(SCREEN_WIDTH, width + 2 * GAME_AREA_MARGIN)
+        self.screen_height = GAME_AREA_Y + height + GAME_AREA_MARGIN
+        self.area = pygame.Rect((self.screen_width - width) // 2, GAME_AREA_Y, width, height)
+        self.profile_rect = pygame.Rect((self.area.x + 4, self.area.y + 4), PROFILE_SIZE).clamp(
+            pygame.Rect((0, 0), self.screen_size))
+
+    @property
+    def screen_size(self):
+        return self.screen_width, self.screen_height
+
+
+class Renderer:
+    """游戏画面渲染器
+
+    静态背景（底色、面板、网格线）只绘制一次并缓存在 Surface 上。
+    每帧比较格子颜色、预览方块和统计数值，只重绘变化的区域并用
+    pygame.display.update(rects) 提交；暂停和结束画面静止时不再提交。
+
+    开启 interpolate 时，当前方块按两次重力下落之间的进度平滑下移，
+    方块覆盖过的格子每帧重画。
+
+    draw(present=False) 只在屏幕 Surface 上绘制，随后由 present() 提交到显示器，
+    便于分别统计绘制和提交的耗时。
+    """
+
+    def __init__(self, game, interpolate=False):
+        self.game = game
+        self.interpolate = interpolate
+        self.screen = game.screen
+        self.layout = game.layout
+        self.block_size = self.layout.block_size
+        self.background = None
+        self.text_cache = TextCache()
+        self.atlas = BlockAtlas(self.block_size)
+        # 预览区域始终使用标准大小的方块
+        self.preview_atlas = self.atlas if self.block_size == BLOCK_SIZE else BlockAtlas(BLOCK_SIZE)
+
+        # 上一次绘制到屏幕上的状态
+        self.cells = [0] * (self.layout.columns * self.layout.rows)
+        self.next_piece_key = None
+        self.stats = None
+        self.overlay = None
+        self.piece_cells = set()
+        self.needs_full_redraw = True
+
+        # 等待 present() 提交的区域；pending_flip 为 True 时提交整个画面
+        self.pending_rects = []
+        self.pending_flip = False
+
+        # 帧时间分析叠加层
+        self.profile_visible = False
+        self.profile_panel = None
+        self.profile_built_at = 0.0
+
+    def invalidate(self):
+        """下一帧强制全屏重绘（窗口被遮挡或字体更换后调用）"""
+        self.needs_full_redraw = True
+        self.background = None
+
+    def _build_background(self):
+        """绘制不会变化的背景：底色、面板、标签和网格线"""
+        background = pygame.Surface(self.layout.screen_size).convert()
+        background.fill(PURE_WHITE)
+
+        # 信息区域面板
+        for rect in (PREVIEW_RECT, STATS_RECT):
+            pygame.draw.rect(background, LIGHT_GRAY, rect, border_radius=6)
+            pygame.draw.rect(background, DARK_GRAY, rect, 2, border_radius=6)
+
+        next_text = self.text_cache.render(self.game.medium_font, "下一个方块", ACCENT_BLUE)
+        background.blit(next_text, (25, 5))
+        stats_title = self.text_cache.render(self.game.medium_font, "游戏统计", ACCENT_BLUE)
+        background.blit(stats_title, (165, 5))
+
+        # 游戏区域背景 - 带圆角和阴影效果
+        pygame.draw.rect(background, LIGHT_GRAY, self.layout.area, border_radius=8)
+        pygame.draw.rect(background, DARK_GRAY, self.layout.area, 2, border_radius=8)
+        self._draw_grid_lines(background)
+
+        return background
+
+    def _draw_grid_lines(self, surface):
+        """绘制网格线 - 细线"""
+        area = self.layout.area
+        block_size = self.block_size
+        for x in range(self.layout.columns + 1):
+            pygame.draw.line(surface, GRID_LINE_GRAY,
+                             (area.x + x * block_size, area.top),
+                             (area.x + x * block_size, area.bottom), 1)
+        for y in range(self.layout.rows + 1):
+            pygame.draw.line(surface, GRID_LINE_GRAY,
+                             (area.left, area.y + y * block_size),
+                             (area.right, area.y + y * block_size), 1)
+
+    def _current_cells(self):
+        """合成当前帧每个格子应显示的内容（已落下的方块、落点预览和当前方块）
+
+        普通格子为颜色，落点预览的格子为 (颜色, STATE_GHOST)。
+        """
+        board = self.game.board
+        cells = [color for row in board.grid for color in row]
+        if not self.game.game_over:
+            piece = self.game.current_piece
+            columns = self.layout.columns
+            rows = self.layout.rows
+            ghost_y = board.landing_row(piece)
+            if ghost_y > piece.y:
+                ghost = (piece.color, STATE_GHOST)
+                for x, y in piece.cells:
+                    y += ghost_y
+                    x += piece.x
+                    if 0 <= y < rows and 0 <= x < columns and not cells[y * columns + x]:
+                        cells[y * columns + x] = ghost
+            if not self.interpolate:
+                for x, y in piece.get_blocks():
+                    if 0 <= y < rows and 0 <= x < columns:
+                        cells[y * columns + x] = piece.color
+        return cells
+
+    def _sprite(self, cell):
+        """格子内容对应的方块精灵"""
+        if len(cell) == 2:
+            return self.atlas.get(*cell)
+        return self.atlas.get(cell)
+
+    def _current_stats(self):
+        board = self.game.board
+        return board.score, board.level, board.total_lines
+
+    def _current_overlay(self):
+        if self.game.paused:
+            return 'paused'
+        if self.game.game_over:
+            return 'game_over'
+        return None
+
+    def draw(self, present=True):
+        """绘制一帧，只提交发生变化的区域"""
+        self._draw_frame()
+        if present:
+            self.present()
+
+    def present(self):
+        """把上一次 draw 绘制的内容提交到显示器"""
+        if self.pending_flip:
+            pygame.display.flip()
+        elif self.pending_rects:
+            pygame.display.update(self.pending_rects)
+        self.pending_rects = []
+        self.pending_flip = False
+
+    def _draw_frame(self):
+        overlay = self._current_overlay()
+        profile_visible = self._profiler_visible()
+        if overlay != self.overlay or profile_visible != self.profile_visible:
+            self.needs_full_redraw = True
+
+        if self.needs_full_redraw:
+            self.draw_full(present=False)
+            return
+
+        # 暂停或结束画面静止时无需重绘
+        if overlay is not None:
+            dirty = []
+        elif self.interpolate:
+            # 方块上一帧和这一帧覆盖的格子都要重画
+            piece_blits, piece_cells = self._interpolated_piece()
+            dirty = self._draw_changed_cells(self.piece_cells | piece_cells)
+            self.screen.blits(piece_blits, doreturn=False)
+            self.piece_cells = piece_cells
+        else:
+            dirty = self._draw_changed_cells()
+
+        if overlay is None:
+            next_piece_key = (self.game.next_piece.shape_index, self.game.next_piece.rotation)
+            if next_piece_key != self.next_piece_key:
+                dirty.append(self._draw_next_piece())
+                self.next_piece_key = next_piece_key
+
+            stats = self._current_stats()
+            if stats != self.stats:
+                dirty.append(self._draw_stats())
+                self.stats = stats
+
+        if profile_visible:
+            self._draw_profile_panel(dirty)
+
+        self.pending_rects.extend(dirty)
+
+    def draw_full(self, present=True):
+        """重绘整个画面"""
+        if self.background is None:
+            self.background = self._build_background()
+        self.screen.blit(self.background, (0, 0))
+
+        self.cells = self._current_cells()
+        blocks = []
+        columns = self.layout.columns
+        for index, color in enumerate(self.cells):
+            if color:
+                y, x = divmod(index, columns)
+                blocks.append((self._sprite(color), self._cell_origin(x, y)))
+        self.screen.blits(blocks, doreturn=False)
+        self._draw_grid_lines(self.screen)
+
+        if self.interpolate:
+            piece_blits, self.piece_cells = self._interpolated_piece()
+            self.screen.blits(piece_blits, doreturn=False)
+
+        self._draw_next_piece()
+        self.next_piece_key = (self.game.next_piece.shape_index, self.game.next_piece.rotation)
+        self._draw_stats()
+        self.stats = self._current_stats()
+
+        # 绘制游戏状态
+        self.overlay = self._current_overlay()
+        if self.overlay == 'paused':
+            self.draw_pause_screen()
+        elif self.overlay == 'game_over':
+            self.draw_game_over_screen()
+
+        self.profile_visible = self._profiler_visible()
+        if self.profile_visible:
+            self.profile_panel = None
+            self._draw_profile_panel([])
+
+        self.pending_flip = True
+        self.needs_full_redraw = False
+        if present:
+            self.present()
+
+    def _profiler_visible(self):
+        profiler = getattr(self.game, 'profiler', None)
+        return profiler is not None and profiler.visible
+
+    def _build_profile_panel(self):
+        """把帧时间统计渲染成一块不透明的面板"""
+        stats = self.game.profiler.get_stats()
+        shares = stats['shares']
+        lines = [
+            f"帧时间 p50 {stats['p50_ms']:.1f} ms  p99 {stats['p99_ms']:.1f} ms",
+            f"最长 {stats['max_ms']:.1f} ms  掉帧 {stats['dropped']}/{stats['frames']}",
+        ]
+        lines.extend(f"{PROFILE_LABELS[name]} {share:6.1%}" for name, share in shares.items())
+
+        font = self.game.small_font
+        panel = pygame.Surface(PROFILE_SIZE).convert()
+        panel.fill(BLACK)
+        line_height = (PROFILE_SIZE[1] - 2 * PROFILE_PADDING) // len(lines)
+        for i, line in enumerate(lines):
+            panel.blit(font.render(line, True, PURE_WHITE),
+                       (PROFILE_PADDING, PROFILE_PADDING + i * line_height))
+        return panel
+
+    def _draw_profile_panel(self, dirty):
+        """在游戏区域左上角绘制帧时间面板，面板内容每 PROFILE_REFRESH 秒更新一次
+
+        面板不透明，直接覆盖在本帧已绘制的内容之上；内容更新或下方有格子重画时
+        才重新绘制，并把面板区域加入 dirty。
+        """
+        now = time.perf_counter()
+        rebuilt = False
+        if self.profile_panel is None or now - self.profile_built_at >= PROFILE_REFRESH:
+            self.profile_panel = self._build_profile_panel()
+            self.profile_built_at = now
+            rebuilt = True
+
+        rect = self.layout.profile_rect
+        if rebuilt or rect.collidelist(dirty) != -1:
+            self.screen.blit(self.profile_panel, rect)
+            dirty.append(rect)
+
+    def _cell_origin(self, x, y):
+        return self.layout.area.x + x * self.block_size, self.layout.area.y + y * self.block_size
+
+    def _interpolated_piece(self):
+        """计算插值后的当前方块，返回 (blits 列表, 覆盖的格子下标集合)"""
+        game = self.game
+        if game.game_over:
+            return [], set()
+
+        piece = game.current_piece
+        offset = 0
+        if piece.y < game.board.landing_row(piece):
+            progress = (game.fall_time + game.render_alpha * FRAME_TIME) / game.get_fall_speed()
+            offset = int(min(progress, 1.0) * self.block_size)
+
+        sprite = self.atlas.get(piece.color)
+        blits = []
+        covered = set()
+        columns = self.layout.columns
+        rows = self.layout.rows
+        for x, y in piece.get_blocks():
+            if y < 0:
+                continue
+            origin_x, origin_y = self._cell_origin(x, y)
+            blits.append((sprite, (origin_x, origin_y + offset)))
+            for row in ((y, y + 1) if offset else (y,)):
+                if 0 <= row < rows:
+                    covered.add(row * columns + x)
+        return blits, covered
+
+    def _draw_changed_cells(self, force=()):
+        """重画颜色发生变化（或在 force 中）的格子，返回需要提交的区域列表"""
+        cells = self._current_cells()
+        previous = self.cells
+        self.cells = cells
+
+        restore = []
+        blocks = []
+        columns = self.layout.columns
+        size = (self.block_size + 1, self.block_size + 1)
+        for index, color in enumerate(cells):
+            if color != previous[index] or index in force:
+                y, x = divmod(index, columns)
+                origin = self._cell_origin(x, y)
+                area = pygame.Rect(origin, size)
+                restore.append((self.background, area, area))
+                if color:
+                    # 网格线画在方块之上
+                    blocks.append((self._sprite(color), origin))
+                    blocks.append((self.atlas.grid_overlay, origin))
+
+        # 先用背景恢复，再一次性批量绘制方块
+        self.screen.blits(restore, doreturn=False)
+        self.screen.blits(blocks, doreturn=False)
+        return [area for _, area, _ in restore]
+
+    def _draw_next_piece(self):
+        """绘制下一个方块 - 居中显示"""
+        piece = self.game.next_piece
+        width, height = piece.get_bounding_box()
+        preview_x = PREVIEW_RECT.centerx - (width * BLOCK_SIZE) // 2
+        preview_y = PREVIEW_RECT.centery - (height * BLOCK_SIZE) // 2
+
+        area = PREVIEW_RECT.union(pygame.Rect(preview_x, preview_y, width * BLOCK_SIZE, height * BLOCK_SIZE))
+        self.screen.blit(self.background, area, area)
+
+        sprite = self.preview_atlas.get(piece.color)
+        self.screen.blits([(sprite, (preview_x + x * BLOCK_SIZE, preview_y + y * BLOCK_SIZE))
+                           for x, y in piece.cells], doreturn=False)
+        return area
+
+    def _draw_stats(self):
+        """绘制统计信息"""
+        area = STATS_RECT.inflate(-4, -4)
+        self.screen.blit(self.background, area, area)
+
+        board = self.game.board
+        stats = [
+            ("分数: ", board.score),
+            ("等级: ", board.level),
+            ("消除: ", board.total_lines),
+        ]
+        for i, (label, value) in enumerate(stats):
+            self.text_cache.blit_number(self.screen, (170, 25 + i * 20),  # 调整行间距
+                                        self.game.small_font, value, BLACK, prefix=label)
+        return area
+
+    def draw_pause_screen(self):
+        """绘制暂停界面"""
+        screen_width, screen_height = self.layout.screen_size
+        overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
+        overlay.fill((255, 255, 255, 180))
+        self.screen.blit(overlay, (0, 0))
+
+        # 暂停提示框
+        pause_rect = pygame.Rect(screen_width//2 - 100, screen_height//2 - 60, 200, 120)
+        pygame.draw.rect(self.screen, LIGHT_GRAY, pause_rect, border_radius=10)
+        pygame.draw.rect(self.screen, ACCENT_BLUE, pause_rect, 3, border_radius=10)
+
+        pause_text = self.text_cache.render(self.game.large_font, "游戏暂停", ACCENT_BLUE)
+        continue_text = self.text_cache.render(self.game.small_font, "按 P 键继续游戏", BLACK)
+
+        pause_rect_pos = pause_text.get_rect(center=(screen_width//2, screen_height//2 - 20))
+        continue_rect = continue_text.get_rect(center=(screen_width//2, screen_height//2 + 20))
+
+        self.screen.blit(pause_text, pause_rect_pos)
+        self.screen.blit(continue_text, continue_rect)
+
+    def draw_game_over_screen(self):
+        """绘制游戏结束界面"""
+        screen_width, screen_height = self.layout.screen_size
+        overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
+        overlay.fill((255, 255, 255, 200))
+        self.screen.blit(overlay, (0, 0))
+
+        # 游戏结束提示框
+        game_over_rect = pygame.Rect(screen_width//2 - 120, screen_height//2 - 80, 240, 160)
+        pygame.draw.rect(self.screen, LIGHT_GRAY, game_over_rect, border_radius=10)
+        pygame.draw.rect(self.screen, ACCENT_RED, game_over_rect, 3, border_radius=10)
+
+        game_over_text = self.text_cache.render(self.game.large_font, "游戏结束", ACCENT_RED)
+        score_text = self.text_cache.render(self.game.medium_font, f"最终分数: {self.game.board.score}", BLACK)
+        restart_text = self.text_cache.render(self.game.small_font, "按 R 键重新开始", BLACK)
+
+        game_over_rect_pos = game_over_text.get_rect(center=(screen_width//2, screen_height//2 - 40))
+        score_rect = score_text.get_rect(center=(screen_width//2, screen_height//2))
+        restart_rect = restart_text.get_rect(center=(screen_width//2, screen_height//2 + 40))
+
+        self.screen.blit(game_over_text, game_over_rect_pos)
+        self.screen.blit(score_text, score_rect)
+        self.screen.blit(restart_text, restart_rect)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+对局录像 - 紧凑的二进制输入日志和快速回放校验
+
+文件格式（所有整数为小端序）：
+    b'TRPL' | 版本 (1 字节) | 种子 (8 字节) | 宽 (2 字节) | 高 (2 字节) | 出生缓冲行数 (2 字节)
+    事件序列：每个事件一个变长整数 (帧差 << 3) | 动作
+    垃圾行事件：动作为 ACTION_GARBAGE，随后是一个变长整数记录收到的行数
+    结束事件：动作为 ACTION_END，随后是一个变长整数记录最终分数
+
+只记录种子、游戏板尺寸、按键动作和对战中收到的垃圾行，回放时重新模拟即可得到完全相同的对局。
+垃圾行的缺口位置由种子决定，收到的顺序相同即可重现，不需要记录。
+"""
+
+import argparse
+import functools
+import os
+import struct
+import sys
+
+try:
+    from board import Board, GRID_WIDTH, GRID_HEIGHT, SPAWN_BUFFER
+    from engine import GameEngine, ACTION_NONE
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, current_dir)
+    from board import Board, GRID_WIDTH, GRID_HEIGHT, SPAWN_BUFFER
+    from engine import GameEngine, ACTION_NONE
+
+MAGIC = b'TRPL'
+VERSION = 1
+HEADER = struct.Struct('<4sBQHHH')
+
+# 动作占低 3 位，7 保留为结束标记
+ACTION_BITS = 3
+ACTION_END = (1 << ACTION_BITS) - 1
+# ACTION_NONE 从不记录，它的编号用于垃圾行事件
+ACTION_GARBAGE = ACTION_NONE
+
+
+class ReplayError(Exception):
+    """录像文件损坏或格式不支持"""
+
+
+def _write_varint(buffer, value):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data, position):
+    value = 0
+    shift = 0
+    while True:
+        if position >= len(data):
+            raise ReplayError("录像数据不完整")
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+class ReplayRecorder:
+    """在对局中记录 (帧, 动作) 事件和收到的垃圾行"""
+
+    def __init__(self, seed, width=GRID_WIDTH, height=GRID_HEIGHT, buffer=SPAWN_BUFFER):
+        self.seed = seed
+        self.data = bytearray(HEADER.pack(MAGIC, VERSION, seed, width, height, buffer))
+        self.last_frame = 0
+        self.finished = False
+
+    def record(self, frame, action):
+        """记录一个动作，帧号按与上一个事件的差值编码"""
+        _write_varint(self.data, ((frame - self.last_frame) << ACTION_BITS) | action)
+        self.last_frame = frame
+
+    def record_garbage(self, frame, lines):
+        """记录在 frame 帧收到 lines 行垃圾"""
+        self.record(frame, ACTION_GARBAGE)
+        _write_varint(self.data, lines)
+
+    def finish(self, frame, score):
+        """写入结束标记和最终分数，返回完整的录像数据"""
+        if not self.finished:
+            self.record(frame, ACTION_END)
+            _write_varint(self.data, score)
+            self.finished = True
+        return bytes(self.data)
+
+
+def read_replay(data):
+    """解析录像，返回 (种子, (宽, 高, 出生缓冲行数), 事件, 结束帧, 记录的分数)
+
+    事件为 (帧, 动作, 垃圾行数) 的列表，只有动作为 ACTION_GARBAGE 时垃圾行数不为 0。
+    """
+    if len(data) < HEADER.size:
+        raise ReplayError("录像数据不完整")
+    magic, version, seed, width, height, buffer = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ReplayError("不是录像文件")
+    if version != VERSION:
+        raise ReplayError(f"不支持的录像版本: {version}")
+    geometry = (width, height, buffer)
+
+    events = []
+    frame = 0
+    position = HEADER.size
+    while True:
+        value, position = _read_varint(data, position)
+        frame += value >> ACTION_BITS
+        action = value & ACTION_END
+        if action == ACTION_END:
+            score, position = _read_varint(data, position)
+            return seed, geometry, events, frame, score
+        lines = 0
+        if action == ACTION_GARBAGE:
+            lines, position = _read_varint(data, position)
+        events.append((frame, action, lines))
+
+
+def play_replay(data, board_class=Board):
+    """不渲染、不等待，按帧重新模拟整局游戏，返回结束时的引擎
+
+    游戏板用 board_class 按录像中记录的尺寸创建。
+    """
+    seed, (width, height, buffer), events, end_frame, _ = read_replay(data)
+    engine = GameEngine(functools.partial(board_class, width=width, height=height, buffer=buffer),
+                        seed=seed)
+
+    index = 0
+    while engine.frame < end_frame and not engine.game_over:
+        # 同一帧的事件都在该帧的逻辑更新之前按记录顺序执行
+        while index < len(events) and events[index][0] <= engine.frame:
+            _apply_event(engine, events[index])
+            index += 1
+        engine.step()
+
+    # 最后一帧逻辑更新之后的事件（例如导致游戏结束的硬降）
+    while index < len(events) and not engine.game_over:
+        _apply_event(engine, events[index])
+        index += 1
+    return engine
+
+
+def _apply_event(engine, event):
+    _, action, lines = event
+    if action == ACTION_GARBAGE:
+        engine.receive_garbage(lines)
+    else:
+        engine.apply_action(action)
+
+
+def verify_replay(data, claimed_score=None, board_class=Board):
+    """重新模拟录像并核对分数
+
+    claimed_score 为 None 时核对录像中记录的分数。
+    """
+    recorded_score = read_replay(data)[-1]
+    if claimed_score is None:
+        claimed_score = recorded_score
+    engine = play_replay(data, board_class)
+    return engine.board.score == claimed_score, engine.board.score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="校验俄罗斯方块录像")
+    parser.add_argument('files', nargs='+', help="录像文件")
+    args = parser.parse_args()
+
+    failures = 0
+    for path in args.files:
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            ok, score = verify_replay(data)
+        except ReplayError as e:
+            ok, score = False, None
+            print(f"{path}: ❌ {e}")
+            failures += 1
+            continue
+        if not ok:
+            failures += 1
+        print(f"{path}: {'✅' if ok else '❌'} 分数 {score}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
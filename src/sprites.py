@@ -0,0 +1,70 @@
+"""
+方块精灵图集 - 启动时预渲染所有颜色和状态的方块
+"""
+
+import pygame
+
+try:
+    from tetromino import COLORS
+except ImportError:
+    import os
+    import sys
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, current_dir)
+    from tetromino import COLORS
+
+# 方块状态
+STATE_NORMAL = 'normal'   # 普通方块
+STATE_GHOST = 'ghost'     # 落点预览
+STATE_FLASH = 'flash'     # 消行闪烁
+STATES = (STATE_NORMAL, STATE_GHOST, STATE_FLASH)
+
+GRID_LINE_GRAY = (200, 200, 200)
+
+
+class BlockAtlas:
+    """每种颜色、每种状态一个预渲染的 Surface
+
+    绘制游戏板时用 Surface.blits() 一次性批量提交，
+    不再为每个格子调用两次 pygame.draw.rect。
+    """
+
+    def __init__(self, block_size, colors=COLORS):
+        self.block_size = block_size
+        self.sprites = {}
+        for color in colors:
+            for state in STATES:
+                self.sprites[(color, state)] = self._build(color, state)
+
+        # 覆盖在格子上的左侧和上侧网格线
+        self.grid_overlay = pygame.Surface((block_size + 1, block_size + 1), pygame.SRCALPHA)
+        pygame.draw.line(self.grid_overlay, GRID_LINE_GRAY, (0, 0), (0, block_size), 1)
+        pygame.draw.line(self.grid_overlay, GRID_LINE_GRAY, (0, 0), (block_size, 0), 1)
+        self.grid_overlay = self.grid_overlay.convert_alpha()
+
+    def _build(self, color, state):
+        """渲染一个方块"""
+        size = self.block_size - 2
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        rect = surface.get_rect()
+
+        if state == STATE_GHOST:
+            pygame.draw.rect(surface, (*color, 60), rect, border_radius=3)
+            pygame.draw.rect(surface, color, rect, 1, border_radius=3)
+        elif state == STATE_FLASH:
+            bright = tuple(min(255, c + (255 - c) * 2 // 3) for c in color)
+            pygame.draw.rect(surface, bright, rect, border_radius=3)
+            pygame.draw.rect(surface, (255, 255, 255), rect, 1, border_radius=3)
+        else:
+            pygame.draw.rect(surface, color, rect, border_radius=3)
+            # 添加内阴影效果
+            pygame.draw.rect(surface, (255, 255, 255), rect, 1, border_radius=3)
+
+        return surface.convert_alpha()
+
+    def get(self, color, state=STATE_NORMAL):
+        """获取方块精灵，未预渲染的颜色按需补充"""
+        sprite = self.sprites.get((color, state))
+        if sprite is None:
+            sprite = self.sprites[(color, state)] = self._build(color, state)
+        return sprite
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+对局遥测 - 每个方块的事件流，后台线程写入轮转的 gzip 压缩 NDJSON 文件
+
+GameEngine.start_telemetry(writer) 之后，引擎在生成方块、锁定、消行、升级和游戏结束时
+调用 writer.emit(事件字典)。emit 只把字典放进有界队列，从不阻塞：队列满时丢弃事件并计数。
+序列化、压缩和写文件都在后台线程中进行。
+
+每个文件是一个完整的 gzip 流，每行一个 JSON 对象，都带有 session（本写入器内的对局编号）、
+frame（引擎逻辑帧）和 event 字段。写入中的文件以 .part 结尾，写满 rotate_bytes
+（未压缩字节数）或关闭写入器时改名为 .ndjson.gz，分析端只读取完整的文件。
+关闭时在最后一个文件末尾写入 event 为 "writer_closed" 的汇总，记录写入和丢弃的事件数。
+"""
+
+import argparse
+import glob
+import itertools
+import gzip
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import Counter
+
+# 事件类型
+EVENT_START = 'start'
+EVENT_SPAWN = 'spawn'
+EVENT_LOCK = 'lock'
+EVENT_CLEAR = 'clear'
+EVENT_LEVEL = 'level'
+EVENT_GAME_OVER = 'game_over'
+EVENT_WRITER_CLOSED = 'writer_closed'
+
+# 队列中最多排队的事件数，超过时丢弃
+QUEUE_SIZE = 8192
+# 后台线程一次最多取出的事件数
+BATCH_SIZE = 512
+# 单个文件的未压缩字节数上限
+ROTATE_BYTES = 16 * 1024 * 1024
+COMPRESS_LEVEL = 6
+
+FILE_SUFFIX = '.ndjson.gz'
+PART_SUFFIX = '.part'
+
+# 同一进程中创建的写入器编号，保证文件名不重复
+_writer_ids = itertools.count()
+
+
+class TelemetryWriter:
+    """有界事件队列和写文件的后台线程
+
+    主线程调用 emit()，结束时调用 close()（会等待队列写完）。
+    写文件出错时在标准错误输出提示，出错的一批计入 lost，之后的事件全部计入 dropped。
+    """
+
+    def __init__(self, directory, prefix='events', queue_size=QUEUE_SIZE,
+                 rotate_bytes=ROTATE_BYTES, compress_level=COMPRESS_LEVEL):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        # 文件名带启动时间、进程号和写入器编号，多个进程可以写同一个目录
+        self.name = f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_writer_ids)}"
+        self.rotate_bytes = rotate_bytes
+        self.compress_level = compress_level
+        self.events = queue.Queue(queue_size)
+        self.sessions = 0
+        self.written = 0
+        self.dropped = 0        # 队列满或写入器不可用时丢弃（主线程计数）
+        self.lost = 0           # 写文件出错而丢失（后台线程计数）
+        self.closed = False
+        self.failed = False
+        self.files = []
+        self._file = None
+        self._file_bytes = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def new_session(self):
+        """分配一个对局编号"""
+        self.sessions += 1
+        return self.sessions
+
+    def emit(self, event):
+        """把事件放进队列，队列已满或写入器不可用时丢弃"""
+        if self.closed or self.failed:
+            self.dropped += 1
+            return
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """写完队列中的事件，写入汇总并关闭文件"""
+        if self.closed:
+            return
+        self.closed = True
+        self.events.put(None)
+        self.thread.join()
+
+    def _run(self):
+        """后台线程：成批取出事件并写入"""
+        events = self.events
+        while True:
+            batch = [events.get()]
+            try:
+                while len(batch) < BATCH_SIZE and batch[-1] is not None:
+                    batch.append(events.get_nowait())
+            except queue.Empty:
+                pass
+            done = batch[-1] is None
+            if done:
+                batch.pop()
+            if batch and not self.failed:
+                self._write(batch)
+            if done:
+                break
+        if not self.failed:
+            # dropped 由主线程计数，此时主线程已经不再 emit
+            self._write([{'event': EVENT_WRITER_CLOSED, 'written': self.written,
+                          'dropped': self.dropped, 'lost': self.lost}], count=False)
+        self._finish_file()
+
+    def _write(self, batch, count=True):
+        data = ''.join(json.dumps(event, separators=(',', ':')) + '\n' for event in batch).encode()
+        try:
+            if self._file is None:
+                self._open_file()
+            self._file.write(data)
+            self._file_bytes += len(data)
+            if count:
+                self.written += len(batch)
+            if self._file_bytes >= self.rotate_bytes:
+                self._finish_file()
+        except OSError as e:
+            print(f"遥测写入失败: {e}", file=sys.stderr)
+            self.failed = True
+            if count:
+                self.lost += len(batch)
+
+    def _open_file(self):
+        path = os.path.join(self.directory, f"{self.name}-{len(self.files):04d}{FILE_SUFFIX}")
+        self._file = gzip.open(path + PART_SUFFIX, 'wb', compresslevel=self.compress_level)
+        self._file_bytes = 0
+        self.files.append(path)
+
+    def _finish_file(self):
+        """关闭当前文件并去掉 .part 后缀"""
+        if self._file is None:
+            return
+        path = self.files[-1]
+        try:
+            self._file.close()
+            os.replace(path + PART_SUFFIX, path)
+        except OSError as e:
+            print(f"遥测写入失败: {e}", file=sys.stderr)
+            self.failed = True
+        self._file = None
+
+
+def read_events(directory):
+    """按文件名顺序读出目录中所有已完成文件的事件"""
+    for path in sorted(glob.glob(os.path.join(directory, '*' + FILE_SUFFIX))):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+
+def summarize(directory):
+    """统计目录中的事件：各类事件数（start 即对局数）和丢弃数"""
+    counts = Counter()
+    dropped = 0
+    for event in read_events(directory):
+        counts[event['event']] += 1
+        if event['event'] == EVENT_WRITER_CLOSED:
+            dropped += event['dropped'] + event['lost']
+    lines = [f"{kind:>14}: {count}" for kind, count in sorted(counts.items())]
+    lines.append(f"{'dropped':>14}: {dropped}")
+    return "\n".join(lines)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="对局遥测文件")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    summary = subparsers.add_parser('summary', help="统计目录中的事件")
+    summary.add_argument('directory')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == 'summary':
+        print(summarize(args.directory))
+
+
+if __name__ == '__main__':
+    main()
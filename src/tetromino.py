@@ -1,5 +1,14 @@
 import random
 
+try:
+    from board import GRID_WIDTH
+except ImportError:
+    import os
+    import sys
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, current_dir)
+    from board import GRID_WIDTH
+
 # 直接定义常量，避免导入问题
 SHAPES = [
     [[1, 1, 1, 1]],                                   # I
@@ -21,45 +30,164 @@ COLORS = [
     (255, 0, 0),     # Z - 红色
 ]
 
-GRID_WIDTH = 10
+
+def _rotate(shape):
+    """顺时针旋转：转置矩阵然后反转每一行"""
+    rows = len(shape)
+    cols = len(shape[0])
+    return tuple(tuple(shape[rows-1-y][x] for y in range(rows)) for x in range(cols))
+
+
+# 旋转表在导入时一次性计算，按 [方块类型][旋转状态] 索引，全部为不可变元组
+ROTATIONS = []        # 形状矩阵
+CELL_OFFSETS = []     # 各格子相对左上角的 (x, y) 偏移
+BOUNDING_BOXES = []   # (宽, 高)
+for _shape in SHAPES:
+    _shape = tuple(tuple(row) for row in _shape)
+    _states = []
+    for _ in range(4):
+        _states.append(_shape)
+        _shape = _rotate(_shape)
+    ROTATIONS.append(tuple(_states))
+    CELL_OFFSETS.append(tuple(
+        tuple((x, y) for y, row in enumerate(state) for x, cell in enumerate(row) if cell)
+        for state in _states
+    ))
+    BOUNDING_BOXES.append(tuple((len(state[0]), len(state)) for state in _states))
+ROTATIONS = tuple(ROTATIONS)
+CELL_OFFSETS = tuple(CELL_OFFSETS)
+BOUNDING_BOXES = tuple(BOUNDING_BOXES)
+
+# SRS 踢墙偏移表（标准表，y 轴已换成向下为正）：从各状态顺时针旋转时依次尝试的 (dx, dy)，
+# 相对于 SRS 中方块所在的 N×N 旋转框
+_SRS_KICKS_JLSTZ = (
+    ((0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)),    # 0 -> R
+    ((0, 0), (1, 0), (1, 1), (0, -2), (1, -2)),      # R -> 2
+    ((0, 0), (1, 0), (1, -1), (0, 2), (1, 2)),       # 2 -> L
+    ((0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)),   # L -> 0
+)
+_SRS_KICKS_I = (
+    ((0, 0), (-2, 0), (1, 0), (-2, 1), (1, -2)),     # 0 -> R
+    ((0, 0), (-1, 0), (2, 0), (-1, -2), (2, 1)),     # R -> 2
+    ((0, 0), (2, 0), (-1, 0), (2, -1), (-1, 2)),     # 2 -> L
+    ((0, 0), (1, 0), (-2, 0), (1, 2), (-2, -1)),     # L -> 0
+)
+_SRS_KICKS_O = (((0, 0),),) * 4
+# 各方块的 SRS 旋转框：(边长, 状态 0 的形状在框中的行)；I 在 4×4 框的第 1 行，O 不旋转
+_SRS_BOXES = ((4, 1), (3, 0), (3, 0), (2, 0), (3, 0), (3, 0), (3, 0))
+_SRS_KICKS = (_SRS_KICKS_I, _SRS_KICKS_JLSTZ, _SRS_KICKS_JLSTZ, _SRS_KICKS_O,
+              _SRS_KICKS_JLSTZ, _SRS_KICKS_JLSTZ, _SRS_KICKS_JLSTZ)
+
+
+def _box_corners(shape, size, row):
+    """SRS 旋转框内各旋转状态的形状左上角相对框左上角的 (x, y)"""
+    box = [[0] * size for _ in range(size)]
+    for y, shape_row in enumerate(shape):
+        box[row + y][:len(shape_row)] = shape_row
+    box = tuple(tuple(box_row) for box_row in box)
+    corners = []
+    for _ in range(4):
+        cells = [(x, y) for y, box_row in enumerate(box) for x, cell in enumerate(box_row) if cell]
+        corners.append((min(x for x, _ in cells), min(y for _, y in cells)))
+        box = _rotate(box)
+    return corners
+
+
+# 旋转表中的状态裁掉了旋转框的空行空列，方块位置是裁剪后的左上角。
+# 框内绕中心旋转时，裁剪后的左上角会随状态移动，所以踢墙偏移要加上
+# 旋转前后两个状态的左上角之差，结果与 SRS 在框中旋转的位置完全一致。
+# WALL_KICKS[方块类型][旋转状态] 为裁剪后坐标下从该状态顺时针旋转时依次尝试的 (dx, dy)
+WALL_KICKS = []
+for _shape, (_size, _row), _kicks in zip(SHAPES, _SRS_BOXES, _SRS_KICKS):
+    _corners = _box_corners(_shape, _size, _row)
+    WALL_KICKS.append(tuple(
+        tuple((dx + _corners[(_state + 1) % 4][0] - _corners[_state][0],
+               dy + _corners[(_state + 1) % 4][1] - _corners[_state][1])
+              for dx, dy in _kicks[_state])
+        for _state in range(4)
+    ))
+WALL_KICKS = tuple(WALL_KICKS)
+
+# 方块对象池默认保留的空闲对象数
+POOL_SIZE = 16
 
 class Tetromino:
-    def __init__(self, x=None, y=None, shape=None):
+    """一个方块：形状、旋转状态和位置都是小整数，形状数据引用共享的不可变旋转表"""
+
+    __slots__ = ('shape_index', 'color', 'rotation', 'shape', 'cells', 'x', 'y')
+
+    def __init__(self, x=None, y=None, shape=None, rotation=0, board=None):
+        self.reset(x, y, shape, rotation, board)
+    
+    def reset(self, x=None, y=None, shape=None, rotation=0, board=None):
+        """就地重新初始化，参数与构造函数相同（供 TetrominoPool 复用对象）"""
         if shape is None:
             self.shape_index = random.randint(0, len(SHAPES) - 1)
         else:
             self.shape_index = shape
         
-        self.shape = SHAPES[self.shape_index]
         self.color = COLORS[self.shape_index]
+        self.set_rotation(rotation)
         
-        # 初始位置在顶部中间
+        # 初始位置在顶部中间；给出 board 时按其宽度和出生缓冲区计算
         if x is None:
-            x = GRID_WIDTH // 2 - len(self.shape[0]) // 2
+            width = board.width if board is not None else GRID_WIDTH
+            x = width // 2 - len(self.shape[0]) // 2
         if y is None:
-            y = 0
+            y = board.spawn_y if board is not None else 0
             
         self.x = x
         self.y = y
+        return self
+    
+    def set_rotation(self, rotation):
+        """切换到旋转表中的某个旋转状态"""
+        self.rotation = rotation
+        self.shape = ROTATIONS[self.shape_index][rotation]
+        self.cells = CELL_OFFSETS[self.shape_index][rotation]
     
     def rotate(self):
         """旋转方块"""
-        # 转置矩阵然后反转每一行
-        rows = len(self.shape)
-        cols = len(self.shape[0])
-        rotated = [[self.shape[rows-1-y][x] for y in range(rows)] for x in range(cols)]
-        
-        return rotated
+        # 直接从旋转表中取下一个状态
+        return ROTATIONS[self.shape_index][(self.rotation + 1) % 4]
     
     def get_rotated(self):
         """获取旋转后的形状（不改变当前状态）"""
         return self.rotate()
     
+    def get_wall_kicks(self):
+        """获取顺时针旋转时依次尝试的踢墙偏移"""
+        return WALL_KICKS[self.shape_index][self.rotation]
+    
+    def get_bounding_box(self):
+        """获取当前旋转状态的 (宽, 高)"""
+        return BOUNDING_BOXES[self.shape_index][self.rotation]
+    
     def get_blocks(self):
         """获取方块所有格子的位置"""
-        blocks = []
-        for y, row in enumerate(self.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    blocks.append((self.x + x, self.y + y))
-        return blocks
\ No newline at end of file
+        return [(self.x + x, self.y + y) for x, y in self.cells]
+
+
+class TetrominoPool:
+    """空闲方块对象的自由链表
+
+    acquire() 优先复用 release() 归还的对象，只有池空时才新建；
+    最多保留 size 个空闲对象。归还后调用方不能再使用该对象。
+    """
+
+    __slots__ = ('free', 'size')
+
+    def __init__(self, size=POOL_SIZE):
+        self.free = []
+        self.size = size
+
+    def acquire(self, x=None, y=None, shape=None, rotation=0, board=None):
+        """取出一个方块，参数与 Tetromino 构造函数相同"""
+        if self.free:
+            return self.free.pop().reset(x, y, shape, rotation, board)
+        return Tetromino(x, y, shape, rotation, board)
+
+    def release(self, piece):
+        """归还不再使用的方块"""
+        if len(self.free) < self.size:
+            self.free.append(piece)
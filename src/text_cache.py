@@ -0,0 +1,87 @@
+"""
+文字渲染缓存 - 避免每帧重复调用 font.render
+"""
+
+from collections import OrderedDict
+
+# 数字字形图集包含的字符
+DIGITS = "0123456789-"
+
+
+class TextCache:
+    """按 (字体, 文字, 颜色) 缓存渲染好的文字 Surface 的有界 LRU 缓存
+
+    数字通过字形图集逐个拼接，分数等计数器变化时不需要重新渲染整串文字。
+    """
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.atlases = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, color):
+        """获取渲染好的文字，命中缓存时不调用 font.render"""
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def get_digit_atlas(self, font, color):
+        """获取 (字体, 颜色) 对应的数字字形图集"""
+        key = (font, color)
+        atlas = self.atlases.get(key)
+        if atlas is None:
+            self.misses += 1
+            atlas = self.atlases[key] = {char: font.render(char, True, color) for char in DIGITS}
+        else:
+            self.hits += 1
+        return atlas
+
+    def blit_number(self, surface, position, font, value, color, prefix=""):
+        """把 "前缀 + 数字" 绘制到 surface 上，返回绘制的区域宽度
+
+        前缀走 LRU 缓存，数字用字形图集逐个拼接。
+        """
+        x, y = position
+        if prefix:
+            label = self.render(font, prefix, color)
+            surface.blit(label, (x, y))
+            x += label.get_width()
+
+        atlas = self.get_digit_atlas(font, color)
+        glyphs = [atlas[char] for char in str(value)]
+        positions = []
+        for glyph in glyphs:
+            positions.append((glyph, (x, y)))
+            x += glyph.get_width()
+        surface.blits(positions, doreturn=False)
+        return x - position[0]
+
+    def clear(self):
+        """清空缓存（例如更换字体后）"""
+        self.surfaces.clear()
+        self.atlases.clear()
+
+    def get_stats(self):
+        """返回缓存命中统计"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self.surfaces),
+            'hit_rate': self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+AI 锦标赛 - 用多进程并行运行 M 个策略 × K 个种子的无界面对局
+"""
+
+import argparse
+import csv
+import functools
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from engine import GameEngine
+    from ai import Bot, BeamSearch, HeuristicEvaluator
+    from transposition import TranspositionTable
+    from telemetry import TelemetryWriter
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, current_dir)
+    from engine import GameEngine
+    from ai import Bot, BeamSearch, HeuristicEvaluator
+    from transposition import TranspositionTable
+    from telemetry import TelemetryWriter
+
+# 内置策略：评估权重和搜索参数
+POLICIES = {
+    'default': {'weights': {}, 'depth': 2, 'beam_width': 8},
+    'greedy': {'weights': {}, 'depth': 1, 'beam_width': 1},
+    'flat': {'weights': {'bumpiness': -0.4, 'holes': -0.5}, 'depth': 2, 'beam_width': 8},
+    'tucks': {'weights': {}, 'depth': 2, 'beam_width': 8, 'tucks': True},
+    'deep': {'weights': {}, 'depth': 3, 'beam_width': 8, 'table_bytes': 16 * 1024 * 1024},
+}
+
+RECORD_FIELDS = ('policy', 'seed', 'score', 'lines', 'level', 'pieces', 'seconds')
+
+
+def build_bot(policy):
+    """根据策略配置创建 AI"""
+    evaluator = HeuristicEvaluator(policy.get('weights'))
+    table = None
+    if policy.get('table_bytes'):
+        table = TranspositionTable(max_bytes=policy['table_bytes'])
+    search = BeamSearch(evaluator, depth=policy.get('depth', 2),
+                        beam_width=policy.get('beam_width', 8),
+                        tucks=policy.get('tucks', False), table=table)
+    return Bot(search)
+
+
+def run_game(name, policy, seed, max_pieces, telemetry=None):
+    """运行一局无界面对局，返回一条紧凑记录；给出 telemetry 时同时记录每个方块的事件"""
+    start = time.perf_counter()
+    engine = GameEngine(seed=seed, preview_depth=max(1, policy.get('depth', 2) - 1))
+    if telemetry is not None:
+        engine.start_telemetry(telemetry, policy=name)
+    bot = build_bot(policy)
+
+    pieces = 0
+    while not engine.game_over and pieces < max_pieces:
+        bot.play_piece(engine)
+        pieces += 1
+
+    board = engine.board
+    return (name, seed, board.score, board.total_lines, board.level, pieces,
+            round(time.perf_counter() - start, 4))
+
+
+def run_chunk(jobs, telemetry_dir=None):
+    """工作进程一次处理多局，减少进程间通信；每个任务的遥测事件写入各自的文件"""
+    if telemetry_dir is None:
+        return [run_game(*job) for job in jobs]
+    writer = TelemetryWriter(telemetry_dir, prefix='tournament')
+    try:
+        return [run_game(*job, telemetry=writer) for job in jobs]
+    finally:
+        writer.close()
+
+
+def chunked(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run_tournament(policies, seeds, max_pieces=1000, workers=None, chunk_size=4, telemetry_dir=None):
+    """并行运行所有 (策略, 种子) 组合，返回记录列表"""
+    jobs = [(name, policy, seed, max_pieces) for name, policy in policies.items() for seed in seeds]
+    chunks = chunked(jobs, chunk_size)
+
+    records = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_records in executor.map(functools.partial(run_chunk, telemetry_dir=telemetry_dir), chunks):
+            records.extend(chunk_records)
+    return records
+
+
+def summarize(records):
+    """按策略汇总分数"""
+    by_policy = {}
+    for record in records:
+        by_policy.setdefault(record[0], []).append(record)
+
+    lines = []
+    for name, games in by_policy.items():
+        scores = [game[2] for game in games]
+        cleared = [game[3] for game in games]
+        lines.append(f"{name:>12}: {len(games)} 局  平均分数 {statistics.mean(scores):.0f}  "
+                     f"中位数 {statistics.median(scores):.0f}  平均消除 {statistics.mean(cleared):.1f}")
+    return "\n".join(lines)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="俄罗斯方块 AI 锦标赛")
+    parser.add_argument('--policies', default=','.join(POLICIES),
+                        help="逗号分隔的策略名")
+    parser.add_argument('--policy-file', default=None,
+                        help="JSON 文件，内容为 {策略名: {weights, depth, beam_width, tucks, table_bytes}}")
+    parser.add_argument('--seeds', type=int, default=16, help="每个策略运行的种子数")
+    parser.add_argument('--first-seed', type=int, default=0, help="第一个种子")
+    parser.add_argument('--max-pieces', type=int, default=1000, help="每局最多放置的方块数")
+    parser.add_argument('--workers', type=int, default=None, help="工作进程数，默认为 CPU 核数")
+    parser.add_argument('--chunk-size', type=int, default=4, help="每个任务包含的对局数")
+    parser.add_argument('--output', default=None, help="CSV 输出文件，默认输出到标准输出")
+    parser.add_argument('--telemetry', metavar='DIR', default=None,
+                        help="把每个方块的事件写入该目录（见 telemetry.py）")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    available = dict(POLICIES)
+    names = [name for name in args.policies.split(',') if name]
+    if args.policy_file:
+        # 文件中的策略覆盖同名内置策略，并且只运行文件中的策略
+        with open(args.policy_file, encoding='utf-8') as f:
+            custom = json.load(f)
+        available.update(custom)
+        names = list(custom)
+
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        print(f"未知策略: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    policies = {name: available[name] for name in names}
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+
+    start = time.perf_counter()
+    records = run_tournament(policies, seeds, args.max_pieces, args.workers, args.chunk_size,
+                             args.telemetry)
+    elapsed = time.perf_counter() - start
+
+    output = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        writer = csv.writer(output)
+        writer.writerow(RECORD_FIELDS)
+        writer.writerows(records)
+    finally:
+        if args.output:
+            output.close()
+
+    print(summarize(records), file=sys.stderr)
+    print(f"共 {len(records)} 局，用时 {elapsed:.1f} 秒", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+置换表 - 按 (局面哈希, 方块类型) 缓存搜索结果，内存有上限
+"""
+
+from collections import OrderedDict
+
+# 每个条目的大致内存占用（字节）：OrderedDict 节点、键元组、值元组以及哈希和评分对象
+ENTRY_SIZE_ESTIMATE = 280
+
+
+class TranspositionTable:
+    """有界置换表
+
+    超过容量时淘汰最久未使用的条目（LRU），同一个键再次写入时直接覆盖。
+    条目都是单个方块的最佳落点（BeamSearch.best_placement），没有深浅之分。
+    """
+
+    def __init__(self, max_entries=100000, max_bytes=None):
+        if max_bytes is not None:
+            max_entries = min(max_entries, max(1, max_bytes // ENTRY_SIZE_ESTIMATE))
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def get(self, board_hash, shape_index):
+        """查找缓存的结果，返回 (评分, 最佳落点) 或 None"""
+        key = (board_hash, shape_index)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, board_hash, shape_index, score, best_move):
+        """写入一个结果，覆盖同一个键的旧结果"""
+        key = (board_hash, shape_index)
+        entries = self.entries
+        if key in entries:
+            entries.move_to_end(key)
+        elif len(entries) >= self.max_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+        entries[key] = (score, best_move)
+        self.stores += 1
+
+    def clear(self):
+        """清空置换表"""
+        self.entries.clear()
+
+    def get_stats(self):
+        """返回命中率和内存占用统计"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'size': len(self.entries),
+            'max_entries': self.max_entries,
+            'approx_bytes': len(self.entries) * ENTRY_SIZE_ESTIMATE,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,211 @@
+"""
+批量游戏环境 - 用 NumPy 同时推进 N 局游戏
+
+所有游戏板存放在一个 (N, 20, 10) 的 uint8 数组中，0 表示空格，
+其余值为方块类型编号加一。碰撞、消行和计分规则与 Board 完全一致。
+需要安装 numpy。
+"""
+
+import numpy as np
+
+try:
+    from board import (GRID_WIDTH, GRID_HEIGHT, SCORE_SINGLE, SCORE_DOUBLE,
+                       SCORE_TRIPLE, SCORE_TETRIS)
+    from tetromino import SHAPES, BOUNDING_BOXES, WALL_KICKS as TETROMINO_WALL_KICKS
+    from tetromino import CELL_OFFSETS as TETROMINO_CELL_OFFSETS
+    from engine import ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE, ACTION_HARD_DROP
+except ImportError:
+    import os
+    import sys
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, current_dir)
+    from board import (GRID_WIDTH, GRID_HEIGHT, SCORE_SINGLE, SCORE_DOUBLE,
+                       SCORE_TRIPLE, SCORE_TETRIS)
+    from tetromino import SHAPES, BOUNDING_BOXES, WALL_KICKS as TETROMINO_WALL_KICKS
+    from tetromino import CELL_OFFSETS as TETROMINO_CELL_OFFSETS
+    from engine import ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE, ACTION_HARD_DROP
+
+# 按消除行数索引的基础得分（乘以当前等级）；最后一项用于调用方给出的游戏板
+# 一次消除超过 4 行的情况，与 Board.update_stats 一样不得分
+SCORE_TABLE = np.array([0, SCORE_SINGLE, SCORE_DOUBLE, SCORE_TRIPLE, SCORE_TETRIS, 0], dtype=np.int64)
+
+# 从 Tetromino 的旋转表构建 NumPy 查找表
+CELL_OFFSETS = np.array(TETROMINO_CELL_OFFSETS, dtype=np.int64)       # (7, 4, 4, 2)
+SHAPE_WIDTHS = np.array(BOUNDING_BOXES, dtype=np.int64)[:, :, 0]      # (7, 4)
+
+# O 方块只有一个踢墙偏移，用 (0, 0) 补齐到 5 个以便组成规则数组
+WALL_KICKS = np.array([
+    [kicks + ((0, 0),) * (5 - len(kicks)) for kicks in rotations]
+    for rotations in TETROMINO_WALL_KICKS
+], dtype=np.int64)                                                    # (7, 4, 5, 2)
+
+
+class VecTetris:
+    """同时推进 N 局游戏的批量环境
+
+    每次 step 先执行动作，然后方块受重力下落一行；无法下落时锁定。
+    旋转（含踢墙）与硬降规则与 GameEngine 一致，硬降只有下落距离大于 0 时才立即锁定。
+    """
+
+    def __init__(self, num_envs, seed=None):
+        self.num_envs = num_envs
+        self.rng = np.random.default_rng(seed)
+        self.envs = np.arange(num_envs)
+
+        self.grid = np.zeros((num_envs, GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+        self.shape_index = np.zeros(num_envs, dtype=np.int64)
+        self.rotation = np.zeros(num_envs, dtype=np.int64)
+        self.x = np.zeros(num_envs, dtype=np.int64)
+        self.y = np.zeros(num_envs, dtype=np.int64)
+        self.next_shape = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.level = np.ones(num_envs, dtype=np.int64)
+        self.total_lines = np.zeros(num_envs, dtype=np.int64)
+        self.game_over = np.zeros(num_envs, dtype=bool)
+
+        self.reset()
+
+    def reset(self, mask=None):
+        """重置全部（或 mask 选中的）游戏"""
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+
+        self.grid[mask] = 0
+        self.score[mask] = 0
+        self.level[mask] = 1
+        self.total_lines[mask] = 0
+        self.game_over[mask] = False
+        self.next_shape[mask] = self.rng.integers(0, len(SHAPES), size=int(mask.sum()))
+        self._spawn(mask)
+
+    def is_valid_position(self, shape_index, rotation, x, y):
+        """批量检查位置是否有效，返回形状为 (N,) 的布尔数组"""
+        cells = CELL_OFFSETS[shape_index, rotation]
+        cell_x = cells[:, :, 0] + x[:, None]
+        cell_y = cells[:, :, 1] + y[:, None]
+
+        # 检查边界
+        in_bounds = (cell_x >= 0) & (cell_x < GRID_WIDTH) & (cell_y < GRID_HEIGHT)
+
+        # 检查碰撞（只检查网格内的位置）
+        occupied = self.grid[
+            self.envs[:, None],
+            np.clip(cell_y, 0, GRID_HEIGHT - 1),
+            np.clip(cell_x, 0, GRID_WIDTH - 1),
+        ] != 0
+        collides = occupied & (cell_y >= 0)
+
+        return np.all(in_bounds & ~collides, axis=1)
+
+    def step(self, actions):
+        """对每局游戏执行一个动作并推进一步
+
+        返回 (本步消除行数, 本步得分, 游戏是否结束)，均为形状 (N,) 的数组。
+        """
+        actions = np.asarray(actions)
+        active = ~self.game_over
+        score_before = self.score.copy()
+
+        # 左右移动
+        for action, dx in ((ACTION_LEFT, -1), (ACTION_RIGHT, 1)):
+            mask = active & (actions == action)
+            if mask.any():
+                moved = mask & self.is_valid_position(self.shape_index, self.rotation, self.x + dx, self.y)
+                self.x += moved * dx
+
+        # 旋转，依次尝试踢墙偏移，全部无效时保持原状
+        mask = active & (actions == ACTION_ROTATE)
+        if mask.any():
+            rotated = (self.rotation + 1) % 4
+            kicks = WALL_KICKS[self.shape_index, self.rotation]
+            pending = mask.copy()
+            for kick in range(kicks.shape[1]):
+                dx = kicks[:, kick, 0]
+                dy = kicks[:, kick, 1]
+                ok = pending & self.is_valid_position(self.shape_index, rotated, self.x + dx, self.y + dy)
+                self.rotation = np.where(ok, rotated, self.rotation)
+                self.x += ok * dx
+                self.y += ok * dy
+                pending &= ~ok
+                if not pending.any():
+                    break
+
+        # 硬降
+        lock = np.zeros(self.num_envs, dtype=bool)
+        mask = active & (actions == ACTION_HARD_DROP)
+        if mask.any():
+            distance = self.drop_distance(mask)
+            self.y += distance
+            self.score += distance * 2
+            lock |= distance > 0
+
+        # 重力下落一行，无法下落则锁定
+        falling = active & ~lock
+        can_fall = self.is_valid_position(self.shape_index, self.rotation, self.x, self.y + 1)
+        self.y += falling & can_fall
+        lock |= falling & ~can_fall
+
+        lines_cleared = np.zeros(self.num_envs, dtype=np.int64)
+        if lock.any():
+            lines_cleared = self._lock(lock)
+
+        return lines_cleared, self.score - score_before, self.game_over.copy()
+
+    def drop_distance(self, mask):
+        """计算 mask 选中的方块可以直接下落的距离"""
+        distance = np.zeros(self.num_envs, dtype=np.int64)
+        falling = mask.copy()
+        for _ in range(GRID_HEIGHT + 4):
+            falling &= self.is_valid_position(self.shape_index, self.rotation, self.x, self.y + distance + 1)
+            if not falling.any():
+                break
+            distance += falling
+        return distance
+
+    def _lock(self, mask):
+        """锁定方块、消除整行、更新统计并生成新方块"""
+        cells = CELL_OFFSETS[self.shape_index[mask], self.rotation[mask]]
+        cell_x = cells[:, :, 0] + self.x[mask, None]
+        cell_y = cells[:, :, 1] + self.y[mask, None]
+        envs = np.broadcast_to(self.envs[mask, None], cell_y.shape)
+        visible = cell_y >= 0  # 确保不在顶部之外
+        values = np.broadcast_to((self.shape_index[mask] + 1)[:, None], cell_y.shape)
+        self.grid[envs[visible], cell_y[visible], cell_x[visible]] = values[visible].astype(np.uint8)
+
+        lines_cleared = self.clear_lines()
+        self.update_stats(lines_cleared)
+        self._spawn(mask)
+        return lines_cleared
+
+    def clear_lines(self):
+        """清除所有游戏中的完整行，返回每局消除的行数"""
+        full = np.all(self.grid != 0, axis=2)
+        lines_cleared = full.sum(axis=1)
+        if not lines_cleared.any():
+            return lines_cleared
+
+        # 稳定排序把完整行移到顶部，其余行保持原有顺序
+        order = np.argsort(~full, axis=1, kind='stable')
+        self.grid = np.take_along_axis(self.grid, order[:, :, None], axis=1)
+        self.grid[np.arange(GRID_HEIGHT)[None, :] < lines_cleared[:, None]] = 0
+        return lines_cleared
+
+    def update_stats(self, lines_cleared):
+        """更新分数和等级"""
+        self.total_lines += lines_cleared
+        self.score += SCORE_TABLE[np.minimum(lines_cleared, len(SCORE_TABLE) - 1)] * self.level
+
+        # 更新等级（每清除10行升一级）
+        self.level = np.maximum(self.level, self.total_lines // 10 + 1)
+
+    def _spawn(self, mask):
+        """为 mask 选中的游戏生成新方块，并检查游戏是否结束"""
+        count = int(mask.sum())
+        self.shape_index[mask] = self.next_shape[mask]
+        self.next_shape[mask] = self.rng.integers(0, len(SHAPES), size=count)
+        self.rotation[mask] = 0
+        self.x[mask] = GRID_WIDTH // 2 - SHAPE_WIDTHS[self.shape_index[mask], 0] // 2
+        self.y[mask] = 0
+
+        valid = self.is_valid_position(self.shape_index, self.rotation, self.x, self.y)
+        self.game_over |= mask & ~valid
@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+"""
+多人对战 - asyncio TCP 服务器、AI 客户端和本机回环测试
+
+每个客户端在本地运行自己的 GameEngine，服务器只负责配对、转发垃圾行攻击
+和各玩家的状态变化，不做任何模拟。一个进程可以同时承载数百场对局。
+
+协议：每条消息为 1 字节类型加上固定长度的小端序负载（见 MESSAGES），
+没有长度前缀，也不使用 JSON。服务器把同一次事件循环中产生的所有消息
+攒在每个连接的发送缓冲区里，在本轮末尾一次写出。
+
+    python versus.py server --port 7777
+    python versus.py bots --port 7777 --matches 100 --players 2
+    python versus.py local --matches 200 --players 4
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+try:
+    from engine import GameEngine
+    from ai import Bot
+    from tournament import POLICIES, build_bot
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, current_dir)
+    from engine import GameEngine
+    from ai import Bot
+    from tournament import POLICIES, build_bot
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 7777
+
+# 消息类型
+MSG_HELLO = 1       # 客户端 -> 服务器：对局人数
+MSG_START = 2       # 服务器 -> 客户端：种子、玩家编号、对局人数
+MSG_ATTACK = 3      # 客户端 -> 服务器：攻击行数
+MSG_GARBAGE = 4     # 服务器 -> 客户端：攻击来源、行数
+MSG_STATE = 5       # 客户端 -> 服务器：分数、消除行数、堆叠高度
+MSG_PEER_STATE = 6  # 服务器 -> 客户端：玩家编号、分数、消除行数、堆叠高度
+MSG_TOPOUT = 7      # 客户端 -> 服务器：本方游戏结束
+MSG_ELIMINATED = 8  # 服务器 -> 客户端：被淘汰的玩家、名次
+MSG_END = 9         # 服务器 -> 客户端：胜者（无胜者时为 NO_PLAYER）
+
+# 每种消息的格式，首字节为类型
+MESSAGES = {
+    MSG_HELLO: struct.Struct('<BB'),
+    MSG_START: struct.Struct('<BQBB'),
+    MSG_ATTACK: struct.Struct('<BB'),
+    MSG_GARBAGE: struct.Struct('<BBB'),
+    MSG_STATE: struct.Struct('<BIHB'),
+    MSG_PEER_STATE: struct.Struct('<BBIHB'),
+    MSG_TOPOUT: struct.Struct('<B'),
+    MSG_ELIMINATED: struct.Struct('<BBB'),
+    MSG_END: struct.Struct('<BB'),
+}
+# 按类型索引的消息长度，未知类型为 0
+MESSAGE_SIZES = bytes(MESSAGES[t].size if t in MESSAGES else 0 for t in range(256))
+
+MAX_PLAYERS = 16
+NO_PLAYER = 0xFF
+READ_SIZE = 65536
+
+# AI 客户端的节奏：每隔多久放一个方块、最多放多少个方块
+BOT_PIECE_INTERVAL = 0.02
+BOT_MAX_PIECES = 500
+
+
+class ProtocolError(Exception):
+    """收到无法解析的消息"""
+
+
+def encode(message_type, *fields):
+    """编码一条消息"""
+    return MESSAGES[message_type].pack(message_type, *fields)
+
+
+def decode(buffer):
+    """从缓冲区开头解析出所有完整的消息，返回 ([(类型, 字段...), ...], 已消费字节数)"""
+    messages = []
+    position = 0
+    end = len(buffer)
+    while position < end:
+        size = MESSAGE_SIZES[buffer[position]]
+        if not size:
+            raise ProtocolError(f"未知消息类型: {buffer[position]}")
+        if position + size > end:
+            break
+        messages.append(MESSAGES[buffer[position]].unpack_from(buffer, position))
+        position += size
+    return messages, position
+
+
+def stack_height(board):
+    """堆叠高度（已占用的最高行到底部的行数）"""
+    return min(board.height - min(board.top, board.height), 255)
+
+
+class Connection:
+    """服务器端的一个玩家连接"""
+
+    __slots__ = ('writer', 'out', 'match', 'index', 'alive')
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.out = bytearray()
+        self.match = None
+        self.index = 0
+        self.alive = True
+
+
+class Match:
+    """一场对局：玩家列表、存活状态和攻击目标轮转"""
+
+    __slots__ = ('players', 'targets', 'remaining', 'finished')
+
+    def __init__(self, players):
+        self.players = players
+        self.targets = list(range(len(players)))
+        self.remaining = len(players)
+        self.finished = False
+
+    def next_target(self, attacker):
+        """轮流攻击仍存活的对手"""
+        count = len(self.players)
+        last = self.targets[attacker]
+        for step in range(1, count + 1):
+            index = (last + step) % count
+            if index != attacker and self.players[index].alive:
+                self.targets[attacker] = index
+                return self.players[index]
+        return None
+
+
+class VersusServer:
+    """对战服务器
+
+    按请求的人数把玩家放进等待队列，凑齐后开始一场对局。
+    """
+
+    def __init__(self, seed_source=None):
+        self.lobbies = {}
+        self.dirty = set()
+        self.flush_scheduled = False
+        self.server = None
+        self.matches_started = 0
+        self.matches_finished = 0
+        self.seed_source = seed_source or (lambda: int.from_bytes(os.urandom(8), 'little') >> 1)
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """开始监听，port 为 0 时由系统分配，返回实际端口"""
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def send(self, connection, data):
+        """把消息放入发送缓冲区，本轮事件循环结束时统一写出"""
+        connection.out += data
+        self.dirty.add(connection)
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self):
+        """一次写出每个连接积累的所有消息"""
+        self.flush_scheduled = False
+        for connection in self.dirty:
+            if not connection.writer.is_closing():
+                connection.writer.write(bytes(connection.out))
+            del connection.out[:]
+        self.dirty.clear()
+
+    async def handle(self, reader, writer):
+        connection = Connection(writer)
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                buffer += data
+                messages, consumed = decode(buffer)
+                del buffer[:consumed]
+                for message in messages:
+                    self.dispatch(connection, message)
+        except (ProtocolError, ConnectionError):
+            pass
+        finally:
+            self.disconnect(connection)
+            writer.close()
+
+    def dispatch(self, connection, message):
+        message_type = message[0]
+        if message_type == MSG_HELLO:
+            self.join(connection, message[1])
+            return
+
+        match = connection.match
+        if match is None or match.finished or not connection.alive:
+            return
+        if message_type == MSG_ATTACK:
+            target = match.next_target(connection.index)
+            if target is not None:
+                self.send(target, encode(MSG_GARBAGE, connection.index, message[1]))
+        elif message_type == MSG_STATE:
+            data = encode(MSG_PEER_STATE, connection.index, *message[1:])
+            for player in match.players:
+                if player is not connection:
+                    self.send(player, data)
+        elif message_type == MSG_TOPOUT:
+            self.eliminate(connection)
+
+    def join(self, connection, players):
+        """加入等待队列，人数凑齐后开始对局"""
+        if connection.match is not None:
+            return
+        players = max(2, min(players, MAX_PLAYERS))
+        lobby = self.lobbies.setdefault(players, [])
+        lobby.append(connection)
+        if len(lobby) < players:
+            return
+
+        del self.lobbies[players]
+        match = Match(lobby)
+        seed = self.seed_source()
+        for index, player in enumerate(lobby):
+            player.match = match
+            player.index = index
+            self.send(player, encode(MSG_START, seed, index, players))
+        self.matches_started += 1
+
+    def eliminate(self, connection):
+        """淘汰一名玩家，只剩一人时结束对局"""
+        match = connection.match
+        connection.alive = False
+        place = match.remaining
+        match.remaining -= 1
+        data = encode(MSG_ELIMINATED, connection.index, place)
+        for player in match.players:
+            self.send(player, data)
+
+        if match.remaining <= 1:
+            winner = next((player.index for player in match.players if player.alive), NO_PLAYER)
+            data = encode(MSG_END, winner)
+            for player in match.players:
+                self.send(player, data)
+            match.finished = True
+            self.matches_finished += 1
+
+    def disconnect(self, connection):
+        """断线：还在等待的移出队列，对局中的视为游戏结束"""
+        match = connection.match
+        if match is None:
+            for players, lobby in list(self.lobbies.items()):
+                if connection in lobby:
+                    lobby.remove(connection)
+                    if not lobby:
+                        del self.lobbies[players]
+            return
+        if connection.alive and not match.finished:
+            self.eliminate(connection)
+        self.dirty.discard(connection)
+
+
+class VersusClient:
+    """对战客户端：本地运行 GameEngine，由 AI 控制
+
+    每隔 piece_interval 秒放置一个方块，消行产生的攻击立刻发送，
+    分数、消除行数或堆叠高度变化时发送状态。
+    """
+
+    def __init__(self, players=2, bot=None, piece_interval=BOT_PIECE_INTERVAL,
+                 max_pieces=BOT_MAX_PIECES):
+        self.players = players
+        self.bot = bot or Bot()
+        self.piece_interval = piece_interval
+        self.max_pieces = max_pieces
+        self.engine = None
+        self.index = None
+        self.place = None
+        self.winner = None
+        self.peers = {}
+        self.garbage_received = 0
+        self.garbage_sent = 0
+        self.last_state = None
+
+    async def play(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """连接服务器并打完一场对局，返回结果记录"""
+        reader, writer = await asyncio.open_connection(host, port)
+        self.writer = writer
+        self.finished = asyncio.Event()
+        writer.write(encode(MSG_HELLO, self.players))
+
+        buffer = bytearray()
+        while self.engine is None:
+            data = await reader.read(READ_SIZE)
+            if not data:
+                raise ConnectionError("服务器关闭了连接")
+            buffer += data
+            messages, consumed = decode(buffer)
+            del buffer[:consumed]
+            for message in messages:
+                self.handle(message)
+
+        receiver = asyncio.create_task(self.receive(reader, buffer))
+        try:
+            await self.run()
+            await self.finished.wait()
+        finally:
+            receiver.cancel()
+            writer.close()
+        return self.result()
+
+    async def receive(self, reader, buffer):
+        try:
+            messages, consumed = decode(buffer)
+            del buffer[:consumed]
+            for message in messages:
+                self.handle(message)
+            while not self.finished.is_set():
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                buffer += data
+                messages, consumed = decode(buffer)
+                del buffer[:consumed]
+                for message in messages:
+                    self.handle(message)
+        finally:
+            self.finished.set()
+
+    def handle(self, message):
+        """处理一条服务器消息"""
+        message_type = message[0]
+        if message_type == MSG_START:
+            _, seed, self.index, self.players = message
+            self.engine = GameEngine(seed=seed, preview_depth=max(1, self.bot.search.depth - 1))
+        elif message_type == MSG_GARBAGE:
+            self.engine.receive_garbage(message[2])
+            self.garbage_received += message[2]
+        elif message_type == MSG_PEER_STATE:
+            self.peers[message[1]] = message[2:]
+        elif message_type == MSG_ELIMINATED:
+            if message[1] == self.index:
+                self.place = message[2]
+        elif message_type == MSG_END:
+            self.winner = message[1]
+            if message[1] == self.index:
+                self.place = 1
+            self.finished.set()
+
+    async def run(self):
+        """放置方块直到游戏结束、对局结束或达到方块上限"""
+        engine = self.engine
+        pieces = 0
+        while not self.finished.is_set():
+            if engine.game_over or pieces >= self.max_pieces:
+                self.writer.write(encode(MSG_TOPOUT))
+                return
+            self.bot.play_piece(engine)
+            pieces += 1
+            self.send_updates()
+            await self.writer.drain()
+            await asyncio.sleep(self.piece_interval)
+
+    def send_updates(self):
+        """发送攻击和变化了的状态，合并为一次写入"""
+        engine = self.engine
+        data = b''
+        if engine.outgoing_garbage:
+            lines = min(engine.outgoing_garbage, 255)
+            engine.outgoing_garbage -= lines
+            self.garbage_sent += lines
+            data += encode(MSG_ATTACK, lines)
+        board = engine.board
+        state = (min(board.score, 0xFFFFFFFF), min(board.total_lines, 0xFFFF), stack_height(board))
+        if state != self.last_state:
+            self.last_state = state
+            data += encode(MSG_STATE, *state)
+        if data:
+            self.writer.write(data)
+
+    def result(self):
+        board = self.engine.board
+        return {
+            'index': self.index,
+            'players': self.players,
+            'place': self.place,
+            'winner': self.winner,
+            'score': board.score,
+            'lines': board.total_lines,
+            'garbage_sent': self.garbage_sent,
+            'garbage_received': self.garbage_received,
+        }
+
+
+class VersusLink:
+    """供 pygame 客户端使用的网络连接，asyncio 运行在后台线程
+
+    主线程调用 poll() 取出收到的消息，调用 send_* 发送；
+    两边通过线程安全的 deque 和 call_soon_threadsafe 交换数据。
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, players=2):
+        self.host = host
+        self.port = port
+        self.players = players
+        self.inbox = deque()
+        self.loop = asyncio.new_event_loop()
+        self.writer = None
+        self.connected = threading.Event()
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._receive())
+        except (OSError, ProtocolError) as e:
+            self.error = e
+        finally:
+            self.connected.set()
+            self.inbox.append(None)
+
+    async def _receive(self):
+        reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(encode(MSG_HELLO, self.players))
+        self.connected.set()
+        buffer = bytearray()
+        while True:
+            data = await reader.read(READ_SIZE)
+            if not data:
+                return
+            buffer += data
+            messages, consumed = decode(buffer)
+            del buffer[:consumed]
+            self.inbox.extend(messages)
+
+    def poll(self):
+        """取出所有收到的消息；连接断开时包含一个 None"""
+        messages = []
+        while self.inbox:
+            messages.append(self.inbox.popleft())
+        return messages
+
+    def _write(self, data):
+        if self.writer is not None and not self.writer.is_closing():
+            self.writer.write(data)
+
+    def send(self, data):
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._write, data)
+
+    def send_attack(self, lines):
+        self.send(encode(MSG_ATTACK, min(lines, 255)))
+
+    def send_state(self, board):
+        self.send(encode(MSG_STATE, min(board.score, 0xFFFFFFFF),
+                         min(board.total_lines, 0xFFFF), stack_height(board)))
+
+    def send_topout(self):
+        self.send(encode(MSG_TOPOUT))
+
+    def close(self):
+        if self.writer is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.writer.close)
+
+
+async def run_bots(host, port, matches, players, policy='greedy', piece_interval=BOT_PIECE_INTERVAL,
+                   max_pieces=BOT_MAX_PIECES):
+    """同时运行 matches * players 个 AI 客户端，返回所有结果"""
+    clients = [VersusClient(players, build_bot(POLICIES[policy]), piece_interval, max_pieces)
+               for _ in range(matches * players)]
+    return await asyncio.gather(*(client.play(host, port) for client in clients))
+
+
+async def run_local(matches, players, policy='greedy', piece_interval=BOT_PIECE_INTERVAL,
+                    max_pieces=BOT_MAX_PIECES):
+    """在本进程内启动服务器和 AI 客户端，用本机回环连接打完所有对局"""
+    server = VersusServer()
+    port = await server.start(DEFAULT_HOST, 0)
+    try:
+        results = await run_bots(DEFAULT_HOST, port, matches, players, policy, piece_interval, max_pieces)
+    finally:
+        await server.close()
+    return results, server
+
+
+def summarize(results):
+    winners = [r for r in results if r['place'] == 1]
+    lines = [
+        f"{len(results)} 名玩家，{len(winners)} 名胜者",
+        f"平均分数 {statistics.mean(r['score'] for r in results):.0f}  "
+        f"平均送出垃圾行 {statistics.mean(r['garbage_sent'] for r in results):.1f}  "
+        f"平均收到垃圾行 {statistics.mean(r['garbage_received'] for r in results):.1f}",
+    ]
+    return "\n".join(lines)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="俄罗斯方块多人对战")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    server_parser = commands.add_parser('server', help="运行对战服务器")
+    server_parser.add_argument('--host', default=DEFAULT_HOST)
+    server_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+
+    for name, help_text in (('bots', "连接到服务器的 AI 客户端"), ('local', "本进程内的服务器加 AI 客户端")):
+        sub = commands.add_parser(name, help=help_text)
+        if name == 'bots':
+            sub.add_argument('--host', default=DEFAULT_HOST)
+            sub.add_argument('--port', type=int, default=DEFAULT_PORT)
+        sub.add_argument('--matches', type=int, default=10, help="对局数")
+        sub.add_argument('--players', type=int, default=2, help="每局人数")
+        sub.add_argument('--policy', choices=sorted(POLICIES), default='greedy', help="AI 策略")
+        sub.add_argument('--piece-interval', type=float, default=BOT_PIECE_INTERVAL,
+                         help="AI 每隔多少秒放置一个方块")
+        sub.add_argument('--max-pieces', type=int, default=BOT_MAX_PIECES,
+                         help="AI 最多放置的方块数，之后认输")
+    return parser.parse_args()
+
+
+async def serve(host, port):
+    server = VersusServer()
+    port = await server.start(host, port)
+    print(f"对战服务器监听 {host}:{port}", file=sys.stderr)
+    await server.server.serve_forever()
+
+
+def main():
+    args = parse_args()
+    if args.command == 'server':
+        try:
+            asyncio.run(serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    start = time.perf_counter()
+    if args.command == 'bots':
+        results = asyncio.run(run_bots(args.host, args.port, args.matches, args.players, args.policy,
+                                       args.piece_interval, args.max_pieces))
+    else:
+        results, _ = asyncio.run(run_local(args.matches, args.players, args.policy,
+                                           args.piece_interval, args.max_pieces))
+    print(summarize(results), file=sys.stderr)
+    print(f"共 {args.matches} 局，用时 {time.perf_counter() - start:.1f} 秒", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
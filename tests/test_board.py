@@ -0,0 +1,255 @@
+"""
+游戏板测试 - 环形缓冲区消行、增量哈希和列高度、撤销日志、写时复制和垃圾行
+
+每个测试同时检查 Board 和 BitBoard，结果与逐格重新计算的哈希和列高度比较。
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from board import Board, GARBAGE_COLOR, zobrist_keys    # noqa: E402
+from bitboard import BitBoard                           # noqa: E402
+from tetromino import Tetromino                         # noqa: E402
+
+I, O = 0, 3
+BLOCK = (128, 128, 128)
+BOARD_CLASSES = (Board, BitBoard)
+
+
+def all_rows(board):
+    """隐藏行和可见行，从第 -buffer 行开始"""
+    return [list(board.hidden[y]) for y in range(board.buffer)] + [list(row) for row in board.grid]
+
+
+def full_hash(board):
+    keys = zobrist_keys(board.width, board.height, board.buffer)
+    value = 0
+    for index, row in enumerate(all_rows(board)):
+        for x, cell in enumerate(row):
+            if cell:
+                value ^= keys[index - board.buffer][x]
+    return value
+
+
+def full_tops(board):
+    tops = [board.height] * board.width
+    for index, row in reversed(list(enumerate(all_rows(board)))):
+        for x, cell in enumerate(row):
+            if cell:
+                tops[x] = index - board.buffer
+    return tops
+
+
+def state(board):
+    return (all_rows(board), board.hash, list(board.column_tops), board.top,
+            board.score, board.total_lines)
+
+
+def fill(board, cells):
+    for x, y in cells:
+        if y < 0:
+            board.hidden[y][x] = BLOCK
+        else:
+            board.grid[y][x] = BLOCK
+    board.sync()
+
+
+def rows_except(rows, width, column):
+    return [(x, y) for y in rows for x in range(width) if x != column]
+
+
+def vertical_i(x, y):
+    return Tetromino(x=x, y=y, shape=I, rotation=1)
+
+
+class BoardTestCase(unittest.TestCase):
+
+    def assertConsistent(self, board):
+        self.assertEqual(board.hash, full_hash(board))
+        self.assertEqual(board.column_tops, full_tops(board))
+        if isinstance(board, BitBoard):
+            rows = all_rows(board)
+            bits = list(board.hidden_rows) + list(board.rows)
+            self.assertEqual(bits, [sum(1 << x for x, cell in enumerate(row) if cell) for row in rows])
+
+
+class ClearLinesTest(BoardTestCase):
+
+    def check_clear(self, buffer, cleared, stack, expect_base_moved):
+        """cleared 中的行除第 0 列外填满，竖放的 I 从 cleared[0] 起补上第 0 列；stack 为其余格子"""
+        for board_class in BOARD_CLASSES:
+            with self.subTest(board=board_class.__name__, buffer=buffer):
+                board = board_class(10, 20, buffer)
+                fill(board, rows_except(cleared, 10, 0) + stack)
+                expected = all_rows(board)
+                for y in range(cleared[0], cleared[0] + 4):
+                    expected[y + buffer][0] = BLOCK
+                base = board.base
+                self.assertEqual(board.place_tetromino(vertical_i(0, cleared[0])), len(cleared))
+
+                # 被消除的行从期望结果中去掉，顶部补上空行
+                expected = [row for index, row in enumerate(expected)
+                            if index - buffer not in cleared]
+                expected = [[0] * 10 for _ in cleared] + expected
+                rows = [[1 if cell else 0 for cell in row] for row in all_rows(board)]
+                self.assertEqual(rows, [[1 if cell else 0 for cell in row] for row in expected])
+                self.assertEqual(board.base != base, expect_base_moved)
+                self.assertConsistent(board)
+
+    def test_clear_with_few_rows_above(self):
+        # 上方只有几行：上方的行下移，base 不动
+        stack = [(3, 5), (4, 5), (3, 6), (7, 8)] + rows_except(range(10, 20), 10, 5)
+        for buffer in (0, 2):
+            self.check_clear(buffer, [6, 7, 8, 9], stack, expect_base_moved=False)
+
+    def test_clear_with_few_rows_below(self):
+        # 下方只有几行：下方的行上移，base 前移
+        stack = [(2, 3), (2, 4), (5, 4)] + rows_except(range(5, 16), 10, 8) + [(9, 18)]
+        for buffer in (0, 2):
+            self.check_clear(buffer, [16, 17, 19], stack, expect_base_moved=True)
+
+    def test_clear_reaching_hidden_rows(self):
+        # 堆到缓冲区里的方块随消行下移到可见区域
+        stack = [(1, -2), (1, -1), (6, -1)] + rows_except(range(0, 16), 10, 4)
+        self.check_clear(2, [16, 17, 18, 19], stack, expect_base_moved=True)
+
+
+class UndoTest(BoardTestCase):
+
+    def test_restore_across_clear_that_moves_base(self):
+        for board_class in BOARD_CLASSES:
+            with self.subTest(board=board_class.__name__):
+                board = board_class(10, 20, 2)
+                fill(board, rows_except(range(16, 20), 10, 0) + rows_except(range(2, 16), 10, 7))
+                before = state(board)
+                base = board.base
+
+                mark = board.snapshot()
+                self.assertEqual(board.place_tetromino(vertical_i(0, 16)), 4)
+                self.assertNotEqual(board.base, base)
+                board.place_tetromino(Tetromino(x=4, y=0, shape=O))
+                board.add_garbage(1, 3)
+                board.restore(mark)
+                board.commit()
+
+                self.assertEqual(state(board), before)
+                self.assertConsistent(board)
+                # 撤销后的游戏板与从未改动过的一样继续使用
+                fresh = board_class(10, 20, 2)
+                fill(fresh, rows_except(range(16, 20), 10, 0) + rows_except(range(2, 16), 10, 7))
+                for target in (board, fresh):
+                    target.place_tetromino(vertical_i(0, 16))
+                self.assertEqual(state(board), state(fresh))
+                self.assertConsistent(board)
+
+    def test_nested_marks(self):
+        for board_class in BOARD_CLASSES:
+            with self.subTest(board=board_class.__name__):
+                board = board_class()
+                fill(board, rows_except(range(18, 20), 10, 0))
+                outer = board.snapshot()
+                board.place_tetromino(Tetromino(x=4, y=16, shape=O))
+                middle = state(board)
+                inner = board.snapshot()
+                board.place_tetromino(vertical_i(0, 16))
+                board.restore(inner)
+                self.assertEqual(state(board), middle)
+                board.restore(outer)
+                self.assertEqual(all_rows(board), [[0] * 10 for _ in range(18)]
+                                 + [[0] + [BLOCK] * 9 for _ in range(2)])
+                self.assertConsistent(board)
+
+
+class CloneTest(BoardTestCase):
+
+    def test_writes_on_both_sides_stay_isolated(self):
+        cells = rows_except(range(16, 20), 10, 0) + [(5, 15)]
+        for board_class in BOARD_CLASSES:
+            with self.subTest(board=board_class.__name__):
+                board = board_class()
+                fill(board, cells)
+                clone = board.clone()
+
+                # 原游戏板消行，克隆在共享的行上放方块，然后两边再各写一次
+                board.place_tetromino(vertical_i(0, 16))
+                clone.place_tetromino(Tetromino(x=1, y=13, shape=O))
+                board.place_tetromino(Tetromino(x=8, y=18, shape=O))
+                clone.add_garbage(2, 4)
+
+                for target, moves in ((board, [vertical_i(0, 16), Tetromino(x=8, y=18, shape=O)]),
+                                      (clone, [Tetromino(x=1, y=13, shape=O), (2, 4)])):
+                    fresh = board_class()
+                    fill(fresh, cells)
+                    for move in moves:
+                        if isinstance(move, tuple):
+                            fresh.add_garbage(*move)
+                        else:
+                            fresh.place_tetromino(move)
+                    self.assertEqual(state(target), state(fresh))
+                    self.assertConsistent(target)
+
+    def test_clone_of_clone(self):
+        for board_class in BOARD_CLASSES:
+            with self.subTest(board=board_class.__name__):
+                board = board_class()
+                fill(board, rows_except(range(18, 20), 10, 0))
+                first = board.clone()
+                second = first.clone()
+                second.place_tetromino(vertical_i(0, 16))
+                self.assertEqual(second.total_lines, 2)
+                self.assertEqual(board.total_lines, 0)
+                self.assertEqual(all_rows(board), all_rows(first))
+                self.assertEqual(board.grid[19][1], BLOCK)
+                for target in (board, first, second):
+                    self.assertConsistent(target)
+
+    def test_clone_while_journaling_is_rejected(self):
+        board = Board()
+        board.snapshot()
+        board.place_tetromino(Tetromino(x=4, y=18, shape=O))
+        with self.assertRaises(RuntimeError):
+            board.clone()
+
+
+class GarbageTest(BoardTestCase):
+
+    def test_rows_rise_and_hole_is_kept(self):
+        for board_class in BOARD_CLASSES:
+            with self.subTest(board=board_class.__name__):
+                board = board_class(10, 20, 2)
+                fill(board, [(3, 18), (3, 19)])
+                self.assertFalse(board.add_garbage(2, 6))
+                self.assertEqual([x for x in range(10) if board.grid[19][x] != GARBAGE_COLOR], [6])
+                self.assertEqual([x for x in range(10) if board.grid[18][x] != GARBAGE_COLOR], [6])
+                self.assertEqual(board.grid[16][3], BLOCK)
+                self.assertEqual(board.grid[17][3], BLOCK)
+                self.assertEqual(board.top, 16)
+                self.assertConsistent(board)
+
+    def test_overflow_pushes_blocks_out_of_buffer(self):
+        for board_class in BOARD_CLASSES:
+            for buffer in (0, 2):
+                with self.subTest(board=board_class.__name__, buffer=buffer):
+                    board = board_class(10, 20, buffer)
+                    fill(board, [(2, y) for y in range(1 - buffer, 20)])
+                    self.assertFalse(board.add_garbage(1, 0))
+                    self.assertEqual(board.top, -buffer)
+                    self.assertTrue(board.add_garbage(1, 0))
+                    self.assertEqual(board.top, -buffer)
+                    self.assertConsistent(board)
+
+    def test_more_garbage_than_rows(self):
+        for board_class in BOARD_CLASSES:
+            with self.subTest(board=board_class.__name__):
+                board = board_class(10, 20, 2)
+                fill(board, [(0, 19)])
+                self.assertTrue(board.add_garbage(30, 9))
+                self.assertTrue(all(row[9] == 0 and row[0] == GARBAGE_COLOR for row in all_rows(board)))
+                self.assertConsistent(board)
+
+
+if __name__ == '__main__':
+    unittest.main()
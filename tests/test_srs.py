@@ -0,0 +1,87 @@
+"""
+SRS 旋转测试 - 踢墙后的位置与 SRS 在旋转框中的参考位置一致
+
+参考位置按 SRS 的定义手工算出：方块在 N×N 旋转框中绕框中心旋转，
+依次尝试标准踢墙表中的偏移，取第一个不冲突的位置。
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from board import Board                     # noqa: E402
+from bitboard import BitBoard               # noqa: E402
+from engine import GameEngine               # noqa: E402
+from tetromino import Tetromino, ROTATIONS  # noqa: E402
+
+I, T = 0, 5
+BLOCK = (128, 128, 128)
+
+
+def make_engine(board_class, filled=(), shape=T, x=0, y=0, rotation=0):
+    """空游戏板上填入 filled 中的格子，当前方块放在 (x, y)"""
+    engine = GameEngine(board_class, seed=0)
+    board = engine.board
+    for cx, cy in filled:
+        board.grid[cy][cx] = BLOCK
+    board.sync()
+    engine.current_piece = Tetromino(x=x, y=y, shape=shape, rotation=rotation)
+    return engine
+
+
+def row_except(y, *holes):
+    return [(x, y) for x in range(10) if x not in holes]
+
+
+class SRSRotationTest(unittest.TestCase):
+
+    def assertRotatesTo(self, expected, filled=(), **piece):
+        for board_class in (Board, BitBoard):
+            with self.subTest(board=board_class.__name__):
+                engine = make_engine(board_class, filled, **piece)
+                self.assertTrue(engine.rotate_piece())
+                self.assertEqual(sorted(engine.current_piece.get_blocks()), sorted(expected))
+
+    def test_t_rotates_about_center(self):
+        # 框在 (3, 5)：T 的中心格 (4, 6) 不动，状态 R 占框的第 1 列
+        self.assertRotatesTo([(4, 5), (4, 6), (5, 6), (4, 7)], shape=T, x=3, y=5)
+
+    def test_i_rotates_about_box_center(self):
+        # 状态 0 在 4×4 框 (3, 4) 的第 1 行，状态 R 在框的第 2 列
+        self.assertRotatesTo([(5, 4), (5, 5), (5, 6), (5, 7)], shape=I, x=3, y=5)
+
+    def test_full_turn_returns_to_start(self):
+        for shape in range(len(ROTATIONS)):
+            engine = make_engine(Board, shape=shape, x=4, y=8)
+            start = sorted(engine.current_piece.get_blocks())
+            for _ in range(4):
+                self.assertTrue(engine.rotate_piece())
+            self.assertEqual(sorted(engine.current_piece.get_blocks()), start, shape)
+
+    def test_i_kick_off_left_wall(self):
+        # 状态 R 贴左墙（框在 (-2, 5)），R -> 2：(0,0) 和 (-1,0) 越界，第 3 个偏移 (+2,0) 成立
+        self.assertRotatesTo([(0, 7), (1, 7), (2, 7), (3, 7)], shape=I, x=0, y=5, rotation=1)
+
+    def test_i_kick_off_right_wall(self):
+        # 状态 L 贴右墙（框在 (8, 5)），L -> 0：(0,0) 和 (+1,0) 越界，第 3 个偏移 (-2,0) 成立
+        self.assertRotatesTo([(6, 6), (7, 6), (8, 6), (9, 6)], shape=I, x=9, y=5, rotation=3)
+
+    def test_t_spin_triple(self):
+        # T 在状态 0（框在 (3, 15)），下方是 TST 槽：第 3 列三格深，第 18 行向右多空一格，
+        # (4, 17) 悬在凸起上方。(3, 15) 和 (5, 14) 挡住第 2、4 个偏移，
+        # 0 -> R 用第 5 个偏移 (-1, -2)（y 向上），落入槽中并消除三行
+        filled = (row_except(17, 3) + row_except(18, 3, 4) + row_except(19, 3)
+                  + [(3, 15), (5, 14)])
+        expected = [(3, 17), (3, 18), (4, 18), (3, 19)]
+        self.assertRotatesTo(expected, filled, shape=T, x=3, y=15)
+        for board_class in (Board, BitBoard):
+            with self.subTest(board=board_class.__name__):
+                engine = make_engine(board_class, filled, shape=T, x=3, y=15)
+                engine.rotate_piece()
+                self.assertEqual(engine.board.place_tetromino(engine.current_piece), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()